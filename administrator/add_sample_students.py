@@ -1,47 +1,110 @@
 from app import app, db, Student
+from sqlalchemy.dialects import postgresql, sqlite
+from contextlib import nullcontext
+from itertools import islice
+import logging
 import random
+import sys
 
-sample_students = [
-    {"id": "ST001", "name": "Arjun Sharma", "class": "Grade 10", "contact": "Ramesh Sharma", "phone": "+91-9876543210"},
-    {"id": "ST002", "name": "Priya Patel", "class": "Grade 11", "contact": "Meera Patel", "phone": "+91-9876543211"},
-    {"id": "ST003", "name": "Rahul Singh", "class": "Grade 9", "contact": "Suresh Singh", "phone": "+91-9876543212"},
-    {"id": "ST004", "name": "Sneha Gupta", "class": "Grade 12", "contact": "Rajesh Gupta", "phone": "+91-9876543213"},
-    {"id": "ST005", "name": "Vikram Kumar", "class": "Grade 10", "contact": "Sunita Kumar", "phone": "+91-9876543214"},
-    {"id": "ST006", "name": "Ananya Rao", "class": "Grade 11", "contact": "Venkat Rao", "phone": "+91-9876543215"},
-    {"id": "ST007", "name": "Karan Joshi", "class": "Grade 9", "contact": "Pooja Joshi", "phone": "+91-9876543216"},
-    {"id": "ST008", "name": "Riya Mehta", "class": "Grade 12", "contact": "Amit Mehta", "phone": "+91-9876543217"},
-    {"id": "ST009", "name": "Aadhya Reddy", "class": "Grade 8", "contact": "Srinivas Reddy", "phone": "+91-9876543218"},
-    {"id": "ST010", "name": "Rohan Verma", "class": "Grade 7", "contact": "Kavita Verma", "phone": "+91-9876543219"},
-    {"id": "ST011", "name": "Ishita Agarwal", "class": "Grade 10", "contact": "Deepak Agarwal", "phone": "+91-9876543220"},
-    {"id": "ST012", "name": "Harsh Malik", "class": "Grade 11", "contact": "Nisha Malik", "phone": "+91-9876543221"},
-    {"id": "ST013", "name": "Diya Kapoor", "class": "Grade 6", "contact": "Rohit Kapoor", "phone": "+91-9876543222"},
-    {"id": "ST014", "name": "Aryan Tiwari", "class": "Grade 8", "contact": "Sunita Tiwari", "phone": "+91-9876543223"},
-    {"id": "ST015", "name": "Kavya Nair", "class": "Grade 9", "contact": "Manoj Nair", "phone": "+91-9876543224"},
-]
+# (name, class, emergency contact, phone); student IDs are derived from the row position
+sample_students = (
+    ("Arjun Sharma", "Grade 10", "Ramesh Sharma", "+91-9876543210"),
+    ("Priya Patel", "Grade 11", "Meera Patel", "+91-9876543211"),
+    ("Rahul Singh", "Grade 9", "Suresh Singh", "+91-9876543212"),
+    ("Sneha Gupta", "Grade 12", "Rajesh Gupta", "+91-9876543213"),
+    ("Vikram Kumar", "Grade 10", "Sunita Kumar", "+91-9876543214"),
+    ("Ananya Rao", "Grade 11", "Venkat Rao", "+91-9876543215"),
+    ("Karan Joshi", "Grade 9", "Pooja Joshi", "+91-9876543216"),
+    ("Riya Mehta", "Grade 12", "Amit Mehta", "+91-9876543217"),
+    ("Aadhya Reddy", "Grade 8", "Srinivas Reddy", "+91-9876543218"),
+    ("Rohan Verma", "Grade 7", "Kavita Verma", "+91-9876543219"),
+    ("Ishita Agarwal", "Grade 10", "Deepak Agarwal", "+91-9876543220"),
+    ("Harsh Malik", "Grade 11", "Nisha Malik", "+91-9876543221"),
+    ("Diya Kapoor", "Grade 6", "Rohit Kapoor", "+91-9876543222"),
+    ("Aryan Tiwari", "Grade 8", "Sunita Tiwari", "+91-9876543223"),
+    ("Kavya Nair", "Grade 9", "Manoj Nair", "+91-9876543224"),
+)
+
+# Dialect-specific INSERT constructs that support ON CONFLICT DO NOTHING; other databases
+# fall back to skipping IDs that a SELECT finds already present
+upsert_inserts = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+# Rows per INSERT batch when seeding large synthetic fixtures
+CHUNK_SIZE = 10000
+
+def generate_students(n):
+    """Yield n student rows: the hand-written fixtures first, then synthetic ones"""
+    for i in range(n):
+        # Deterministic IDs (ST001, ST002, ...) instead of storing them in each fixture row
+        student_id = f"ST{i + 1:03d}"
+        if i < len(sample_students):
+            yield (student_id, *sample_students[i])
+        else:
+            yield (student_id, f"Student {i + 1}", f"Grade {i % 12 + 1}",
+                   f"Guardian {i + 1}", f"+91-{9000000000 + i}")
+
+def pipelined(session):
+    """Send seed statements without waiting for each ACK on psycopg 3 connections; no-op otherwise"""
+    if db.engine.dialect.driver != 'psycopg':
+        return nullcontext()
+    return session.connection().connection.driver_connection.pipeline()
+
+def seed(n=len(sample_students)):
+    with app.app_context(), db.session.no_autoflush:
+        # All seed data lands in one transaction (one COMMIT); add other seed tables inside this block.
+        # Autoflush is off so statements issued here never trigger a pre-flush of pending ORM state.
+        with db.session.begin(), pipelined(db.session):
+            app.logger.info("Adding %d sample students...", n)
+
+            # Rows whose student_id already exists are skipped, so re-runs are no-ops
+            insert = upsert_inserts.get(db.engine.dialect.name)
+            if insert is not None:
+                stmt = insert(Student).on_conflict_do_nothing(index_elements=['student_id'])
+            else:
+                app.logger.info("No ON CONFLICT support for %s; checking existing IDs per chunk",
+                                db.engine.dialect.name)
+                stmt = db.insert(Student)
+
+            # Stream rows in fixed-size chunks so memory stays bounded for large n
+            rows = generate_students(n)
+            while True:
+                chunk = list(islice(rows, CHUNK_SIZE))
+                if not chunk:
+                    break
+
+                if insert is None:
+                    existing = set(db.session.scalars(db.select(Student.student_id).where(
+                        Student.student_id.in_([row[0] for row in chunk]))))
+                    chunk = [row for row in chunk if row[0] not in existing]
+                    if not chunk:
+                        continue
+
+                # Random participation percentages (60-100), drawn in one call per chunk
+                participations = random.choices(range(60, 101), k=len(chunk))
+
+                # Plain dicts skip per-instance ORM state; insertmanyvalues batches them into multi-row INSERTs
+                mappings = [{
+                    "student_id": student_id,
+                    "name": name,
+                    "class_name": class_name,
+                    "emergency_contact_name": contact,
+                    "emergency_contact_phone": phone,
+                    "drill_participation": participation,
+                    "status": 'active'
+                } for (student_id, name, class_name, contact, phone), participation
+                    in zip(chunk, participations)]
+
+                db.session.execute(stmt, mappings)
+
+        app.logger.info("Seeded %d sample students successfully (existing IDs skipped)!", n)
 
 def add_sample_students():
-    with app.app_context():
-        # Check if students already exist
-        if Student.query.count() > 0:
-            print("Sample students already exist!")
-            return
-            
-        print("Adding sample students...")
-        
-        for student_data in sample_students:
-            student = Student(
-                student_id=student_data["id"],
-                name=student_data["name"],
-                class_name=student_data["class"],
-                emergency_contact_name=student_data["contact"],
-                emergency_contact_phone=student_data["phone"],
-                drill_participation=random.randint(60, 100),  # Random participation percentage
-                status='active'
-            )
-            db.session.add(student)
-        
-        db.session.commit()
-        print(f"Added {len(sample_students)} sample students successfully!")
+    seed(len(sample_students))
 
 if __name__ == '__main__':
-    add_sample_students()
+    app.logger.setLevel(logging.INFO)
+    # Optional row count, e.g. `python add_sample_students.py 100000` for scale testing
+    seed(int(sys.argv[1]) if len(sys.argv) > 1 else len(sample_students))
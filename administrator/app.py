@@ -1,29 +1,118 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, g, Response, stream_with_context, abort
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, load_only, query_expression, with_expression
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_cors import CORS
+from flask_caching import Cache
+from flask_compress import Compress
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
 import os
 import json
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import atexit
+import operator
+import traceback
 from functools import wraps
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional: JSON responses fall back to the stdlib json module
+
+try:
+    import redis
+except ImportError:
+    redis = None  # Optional: drill participation counters stay in the database
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///emergency_management.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///emergency_management.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'insertmanyvalues_page_size': 1000  # Rows per multi-row INSERT for bulk seeding
+}
+db_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if db_url.get_backend_name() != 'sqlite' or db_url.database not in (None, '', ':memory:'):
+    # Enough pooled connections for concurrent gevent greenlets (see gunicorn.conf.py)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update(pool_size=20, max_overflow=40)
+if db_url.get_driver_name() == 'psycopg2':
+    # psycopg2 only: batch executemany() calls into a couple of round trips
+    app.config['SQLALCHEMY_ENGINE_OPTIONS']['executemany_mode'] = 'values_plus_batch'
 app.config['JWT_SECRET_KEY'] = 'jwt-secret-string'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
+UPLOAD_FILE_MODE = 0o644  # rw-r--r--, what file.save() gives under the usual 022 umask
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)  # Session expires after 2 hours
+app.config['COMPRESS_MIMETYPES'] = ['application/json']  # gzip/br the JSON list endpoints
+app.config['COMPRESS_LEVEL'] = 4  # Balance CPU against ratio
 
 # Enable CORS for cross-origin requests
 CORS(app)
+Compress(app)
 
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
 
+# Cache for slow-changing aggregates (dashboard counters, analytics, public drill pages). With REDIS_URL
+# all gunicorn workers share it, so an invalidation reaches every worker. Without it each worker has its
+# own SimpleCache and invalidations only clear the worker that handled the write: the others may serve
+# values up to their timeout old (30 s dashboard counters, 120 s analytics, 60 s conductor names,
+# 5 s public drill pages).
+if redis is not None and os.environ.get('REDIS_URL'):
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_URL': os.environ['REDIS_URL'],
+        'CACHE_KEY_PREFIX': 'admin-cache:'  # cache.clear() then only deletes these keys, not the counters
+    })
+else:
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+# Optional Redis (REDIS_URL) for write-hot drill participation counters
+if redis is not None and os.environ.get('REDIS_URL'):
+    redis_client = redis.Redis.from_url(os.environ['REDIS_URL'], decode_responses=True)
+else:
+    redis_client = None
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets dashboard reads proceed while check-ins are being written"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL; fsync only at checkpoints
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256 MB
+    cursor.execute('PRAGMA cache_size=-65536')  # 64 MB
+    cursor.close()
+
+def log_lazy_load(orm_execute_state):
+    """Warn when a relationship is lazy-loaded, the usual source of N+1 queries"""
+    if orm_execute_state.lazy_loaded_from is None:
+        return
+    # Innermost frame from our own code (views or templates), not the library stack
+    caller = next((frame for frame in reversed(traceback.extract_stack()[:-1])
+                   if 'site-packages' not in frame.filename), None)
+    app.logger.warning("Lazy load of %s at %s:%s", orm_execute_state.loader_strategy_path[-1],
+                       caller.filename if caller else '?', caller.lineno if caller else '?')
+
+def enable_lazy_load_warnings():
+    """Development only: log every lazy relationship load so it can be eager-loaded"""
+    if not event.contains(Session, 'do_orm_execute', log_lazy_load):
+        event.listen(Session, 'do_orm_execute', log_lazy_load)
+
+if app.debug:
+    enable_lazy_load_warnings()
+
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -39,7 +128,7 @@ class User(db.Model):
 class Incident(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    type = db.Column(db.String(50), nullable=False)  # fire, flood, earthquake, trapped, other
+    type = db.Column(db.String(50), nullable=False, index=True)  # fire, flood, earthquake, trapped, other
     description = db.Column(db.Text)
     location = db.Column(db.String(200))
     latitude = db.Column(db.Float)
@@ -48,20 +137,23 @@ class Incident(db.Model):
     status = db.Column(db.String(20), default='open')  # open, acknowledged, assigned, resolved, false_alarm
     severity = db.Column(db.String(10), default='medium')  # low, medium, high, critical
     assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Status filters with newest-first ordering are served straight from this index
+    __table_args__ = (db.Index('ix_incident_status_created', 'status', 'created_at'),)
+    
     reporter = db.relationship('User', foreign_keys=[reporter_id], backref='reported_incidents')
     responder = db.relationship('User', foreign_keys=[assigned_to], backref='assigned_incidents')
 
 class Checkin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    incident_id = db.Column(db.Integer, db.ForeignKey('incident.id'))
+    incident_id = db.Column(db.Integer, db.ForeignKey('incident.id'), index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    status = db.Column(db.String(20), nullable=False)  # safe, stuck, unknown
+    status = db.Column(db.String(20), nullable=False, index=True)  # safe, stuck, unknown
     location = db.Column(db.String(200))
     message = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Newest-first attendance pages
     
     user = db.relationship('User', backref='checkins')
     incident = db.relationship('Incident', backref='checkins')
@@ -80,6 +172,13 @@ class Drill(db.Model):
     conducted_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Leading slice of description, populated only by queries that ask for it (the drill listing)
+    description_preview = query_expression()
+    
+    # Newest-first listings and keyset pagination seek on (created_at, id); a backward
+    # scan of this index serves ORDER BY created_at DESC, so no separate DESC index is needed
+    __table_args__ = (db.Index('ix_drill_created_id', 'created_at', 'id'),)
+    
     conductor = db.relationship('User', backref='conducted_drills')
 
 class EmergencyContact(db.Model):
@@ -91,7 +190,7 @@ class EmergencyContact(db.Model):
     email = db.Column(db.String(120))
     region = db.Column(db.String(100))
     address = db.Column(db.Text)
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Notification(db.Model):
@@ -103,11 +202,14 @@ class Notification(db.Model):
     target_roles = db.Column(db.String(100))  # comma-separated roles
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Dashboard reads the latest active notifications: filter and sort from one index
+    __table_args__ = (db.Index('ix_notification_active_created', 'is_active', 'created_at'),)
 
 class Student(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.String(20), unique=True, nullable=False)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)  # Student listings are ordered by name
     email = db.Column(db.String(120))
     class_name = db.Column('class', db.String(20), nullable=False)  # Grade 1-12
     emergency_contact_name = db.Column(db.String(100), nullable=False)
@@ -115,22 +217,29 @@ class Student(db.Model):
     medical_conditions = db.Column(db.Text)
     drill_participation = db.Column(db.Integer, default=0)  # Percentage
     last_checkin = db.Column(db.DateTime)
-    status = db.Column(db.String(20), default='active')  # active, inactive, pending
+    status = db.Column(db.String(20), default='active', index=True)  # active, inactive, pending
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class StudentDrillParticipation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False, index=True)
     drill_id = db.Column(db.Integer, db.ForeignKey('drill.id'), nullable=False)
     participated = db.Column(db.Boolean, default=False)
     score = db.Column(db.Float)
     feedback = db.Column(db.Text)
     participated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # One record per student per drill; also covers lookups by drill_id alone
+    __table_args__ = (db.Index('ix_sdp_drill_student', 'drill_id', 'student_id', unique=True),)
+    
     student = db.relationship('Student', backref='drill_participations')
     drill = db.relationship('Drill', backref='student_participations')
 
+# Optional Drill columns, resolved once at import instead of on every request
+DRILL_HAS_LOCATION = hasattr(Drill, 'location')
+DRILL_HAS_SCHEDULED_DATE = hasattr(Drill, 'scheduled_date')
+
 # Helper functions
 def login_required(f):
     @wraps(f)
@@ -146,13 +255,96 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
             return redirect(url_for('login'))
-        user = User.query.get(session['user_id'])
-        if not user or user.role not in ['admin', 'spoc']:
+        if _get_user_role(session['user_id']) not in ['admin', 'spoc']:
             flash('Access denied. Admin privileges required.', 'error')
             return redirect(url_for('dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
+def get_current_user():
+    """Load the logged-in user once per request"""
+    if 'user' not in g:
+        g.user = db.session.get(User, session['user_id'])
+    return g.user
+
+@cache.memoize(timeout=10)
+def _get_user_role(user_id):
+    """Role of a user, cached for a few seconds so a role change still applies promptly; unknown users
+    (None) are never cached. Call cache.delete_memoized(_get_user_role, user_id) to apply a change at once"""
+    return db.session.query(User.role).filter_by(id=user_id).scalar()
+
+def update_participation_percentages(student_ids):
+    """Recompute drill_participation for the given students in a single UPDATE"""
+    total_drills = db.session.query(db.func.count(Drill.id)).scalar()
+    if not total_drills:
+        return
+    
+    db.session.flush()
+    participated = db.select(db.func.count()).where(
+        StudentDrillParticipation.student_id == Student.id,
+        StudentDrillParticipation.participated == True
+    ).correlate(Student).scalar_subquery()
+    percentage = participated * 100 // total_drills  # Integer percentage, floored
+    
+    db.session.execute(
+        db.update(Student)
+        .where(Student.id.in_(student_ids))
+        .values(drill_participation=db.case((percentage > 100, 100), else_=percentage))
+    )
+
+ACTIVE_INCIDENT_STATUSES = ['open', 'acknowledged', 'assigned']
+
+def dumps_json(data):
+    """Encode to JSON bytes; datetimes become ISO 8601 strings on both paths"""
+    if orjson is None:
+        return json.dumps(data, separators=(',', ':'), default=lambda o: o.isoformat()).encode()
+    return orjson.dumps(data)  # Native datetime support, same output as isoformat()
+
+def json_response(data, status=200):
+    """Serialize with orjson when available, otherwise the stdlib json module"""
+    return Response(dumps_json(data), status=status, mimetype='application/json')
+
+def stream_json_array(rows, serialize):
+    """Stream rows as a JSON array one item at a time instead of building the whole list"""
+    def generate():
+        yield b'['
+        for n, row in enumerate(rows):
+            if n:
+                yield b','
+            yield dumps_json(serialize(row))
+        yield b']'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def count_where(condition):
+    """SUM(CASE WHEN condition THEN 1 ELSE 0 END), returning 0 on empty tables"""
+    return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+def invalidate_stats_cache():
+    """Drop cached aggregates after incidents, drills or check-ins change"""
+    cache.delete_many('dashboard_counts', 'analytics')
+
+@cache.cached(timeout=30, key_prefix='dashboard_counts')
+def get_dashboard_counts():
+    """Incident, check-in and drill aggregates computed in a single round trip"""
+    incidents = db.session.query(
+        db.func.count(Incident.id).label('total_incidents'),
+        count_where(Incident.status.in_(ACTIVE_INCIDENT_STATUSES)).label('active_incidents')
+    ).subquery()
+    checkins = db.session.query(
+        count_where(Checkin.status == 'safe').label('safe_checkins'),
+        count_where(Checkin.status == 'stuck').label('stuck_checkins')
+    ).subquery()
+    drills = db.session.query(
+        db.func.count(Drill.id).label('total_drills'),
+        db.func.avg(Drill.score).label('avg_drill_score')
+    ).subquery()
+    
+    # Each subquery yields exactly one row, so joining them on TRUE gives one combined row
+    row = db.session.query(incidents, checkins, drills).select_from(incidents) \
+        .join(checkins, db.true()).join(drills, db.true()).one()
+    return row._asdict()
+
 # Routes
 @app.route('/')
 def index():
@@ -189,13 +381,10 @@ def logout():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    user = User.query.get(session['user_id'])
+    user = get_current_user()
     
     # Get statistics
-    total_incidents = Incident.query.count()
-    active_incidents = Incident.query.filter(Incident.status.in_(['open', 'acknowledged', 'assigned'])).count()
-    safe_checkins = Checkin.query.filter_by(status='safe').count()
-    stuck_checkins = Checkin.query.filter_by(status='stuck').count()
+    counts = get_dashboard_counts()
     
     # Get recent incidents
     recent_incidents = Incident.query.order_by(Incident.created_at.desc()).limit(5).all()
@@ -204,15 +393,14 @@ def dashboard():
     recent_notifications = Notification.query.filter_by(is_active=True).order_by(Notification.created_at.desc()).limit(5).all()
     
     # Calculate preparedness score (mock calculation)
-    total_drills = Drill.query.count()
-    avg_participation = db.session.query(db.func.avg(Drill.score)).scalar() or 0
-    preparedness_score = min(100, (total_drills * 10) + (avg_participation * 0.5))
+    avg_participation = counts['avg_drill_score'] or 0
+    preparedness_score = min(100, (counts['total_drills'] * 10) + (avg_participation * 0.5))
     
     stats = {
-        'total_incidents': total_incidents,
-        'active_incidents': active_incidents,
-        'safe_checkins': safe_checkins,
-        'stuck_checkins': stuck_checkins,
+        'total_incidents': counts['total_incidents'],
+        'active_incidents': counts['active_incidents'],
+        'safe_checkins': counts['safe_checkins'],
+        'stuck_checkins': counts['stuck_checkins'],
         'preparedness_score': round(preparedness_score, 1)
     }
     
@@ -229,7 +417,8 @@ def incidents():
     incident_type = request.args.get('type', '')
     status = request.args.get('status', '')
     
-    query = Incident.query
+    # Reporter/responder are rendered per row; load them in the same query
+    query = Incident.query.options(joinedload(Incident.reporter), joinedload(Incident.responder))
     
     if incident_type:
         query = query.filter_by(type=incident_type)
@@ -244,8 +433,11 @@ def incidents():
 @app.route('/incident/<int:id>')
 @login_required
 def incident_detail(id):
-    incident = Incident.query.get_or_404(id)
-    checkins = Checkin.query.filter_by(incident_id=id).all()
+    incident = db.session.get(
+        Incident, id, options=[joinedload(Incident.reporter), joinedload(Incident.responder)]
+    ) or abort(404)
+    checkins = Checkin.query.options(joinedload(Checkin.user)).filter_by(incident_id=id) \
+        .order_by(Checkin.created_at.desc()).all()
     return render_template('incident_detail.html', incident=incident, checkins=checkins)
 
 @app.route('/create_incident', methods=['GET', 'POST'])
@@ -268,6 +460,7 @@ def create_incident():
         
         db.session.add(incident)
         db.session.commit()
+        invalidate_stats_cache()
         
         flash('Incident reported successfully!', 'success')
         return redirect(url_for('incidents'))
@@ -277,7 +470,13 @@ def create_incident():
 @app.route('/drills')
 @login_required
 def drills():
-    drills = Drill.query.order_by(Drill.created_at.desc()).all()
+    # Only the columns the listing renders; the card shows 100 characters of the description, so
+    # the database returns just enough of it to know whether to add an ellipsis
+    drills = Drill.query.options(
+        load_only(Drill.id, Drill.title, Drill.drill_type, Drill.file_url,
+                  Drill.score, Drill.total_expected, Drill.created_at),
+        with_expression(Drill.description_preview, db.func.substr(Drill.description, 1, 101))
+    ).order_by(Drill.created_at.desc()).all()
     return render_template('drills_new.html', drills=drills)
 
 @app.route('/create_drill', methods=['GET', 'POST'])
@@ -288,14 +487,12 @@ def create_drill():
         # Parse scheduled date
         scheduled_date = None
         if request.form.get('scheduled_date'):
+            # fromisoformat handles both YYYY-MM-DDTHH:MM and YYYY-MM-DD (midnight)
             try:
-                scheduled_date = datetime.strptime(request.form['scheduled_date'], '%Y-%m-%dT%H:%M')
+                scheduled_date = datetime.fromisoformat(request.form['scheduled_date'])
             except ValueError:
-                try:
-                    scheduled_date = datetime.strptime(request.form['scheduled_date'], '%Y-%m-%d')
-                except ValueError:
-                    flash('Invalid date format. Please use YYYY-MM-DD or YYYY-MM-DDTHH:MM format.', 'error')
-                    return render_template('create_drill.html')
+                flash('Invalid date format. Please use YYYY-MM-DD or YYYY-MM-DDTHH:MM format.', 'error')
+                return render_template('create_drill.html')
         
         # Create drill with basic fields first
         drill_data = {
@@ -307,25 +504,41 @@ def create_drill():
         }
         
         # Add new fields if they exist in the model
-        if hasattr(Drill, 'location'):
+        if DRILL_HAS_LOCATION:
             drill_data['location'] = request.form.get('location', 'IGDTUW Campus')
         
-        if hasattr(Drill, 'scheduled_date') and scheduled_date:
+        if DRILL_HAS_SCHEDULED_DATE and scheduled_date:
             drill_data['scheduled_date'] = scheduled_date
         
         drill = Drill(**drill_data)
         
-        # Handle file upload
+        # Handle file upload: write to a temp file in the upload folder, then rename it into place so a
+        # half-written file is never served; file_url is only set once the file exists
         if 'file' in request.files:
             file = request.files['file']
             if file.filename and file.filename != '':
                 filename = secure_filename(file.filename)
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
-                drill.file_url = f'uploads/{filename}'
+                tmp = tempfile.NamedTemporaryFile(dir=app.config['UPLOAD_FOLDER'], delete=False)
+                try:
+                    with tmp:
+                        file.save(tmp)
+                    # Temp files are created 0600; give the upload the usual mode so a proxy/CDN can serve it
+                    os.chmod(tmp.name, UPLOAD_FILE_MODE)
+                    os.replace(tmp.name, os.path.join(app.config['UPLOAD_FOLDER'], filename))
+                    drill.file_url = f'uploads/{filename}'
+                except OSError as e:
+                    app.logger.error("Failed to store drill upload %s: %s", filename, e)
+                    flash('The attached file could not be saved; the drill was created without it.', 'error')
+                finally:
+                    # Only still present if saving or renaming failed
+                    if os.path.exists(tmp.name):
+                        os.remove(tmp.name)
         
         db.session.add(drill)
         db.session.commit()
+        invalidate_stats_cache()
+        cache.delete('conductor_names')
+        invalidate_public_drill_pages()
         
         flash('Drill created successfully!', 'success')
         return redirect(url_for('drills'))
@@ -335,21 +548,96 @@ def create_drill():
 @app.route('/attendance')
 @login_required
 def attendance():
-    checkins = Checkin.query.order_by(Checkin.created_at.desc()).all()
+    page = request.args.get('page', 1, type=int)
     
-    # Group by status
-    safe_count = len([c for c in checkins if c.status == 'safe'])
-    stuck_count = len([c for c in checkins if c.status == 'stuck'])
-    unknown_count = len([c for c in checkins if c.status == 'unknown'])
+    # Group by status in SQL instead of loading every check-in
+    counts = dict(db.session.query(Checkin.status, db.func.count(Checkin.id)).group_by(Checkin.status).all())
     
     stats = {
-        'safe': safe_count,
-        'stuck': stuck_count,
-        'unknown': unknown_count,
-        'total': len(checkins)
+        'safe': counts.get('safe', 0),
+        'stuck': counts.get('stuck', 0),
+        'unknown': counts.get('unknown', 0),
+        'total': sum(counts.values())
     }
     
-    return render_template('attendance_new.html', checkins=checkins, stats=stats)
+    # Only the current page of check-ins is fetched for display
+    checkins = Checkin.query.options(joinedload(Checkin.user)).order_by(Checkin.created_at.desc()).paginate(
+        page=page, per_page=50, error_out=False)
+    
+    return render_template('attendance_new.html', checkins=checkins.items, pagination=checkins, stats=stats)
+
+# Check-ins are group-committed: each request queues its row and waits while the writer inserts
+# everything queued in one transaction, so a surge doesn't cost one commit per submission but a
+# request still only reports success once its row is committed
+CHECKIN_BATCH_INTERVAL = 0.1  # Seconds to let a batch accumulate
+CHECKIN_WRITE_TIMEOUT = 10  # Seconds a request waits for its batch to commit
+checkin_queue = queue.Queue()
+checkin_writer_lock = threading.Lock()
+checkin_writer_thread = None
+checkin_state_lock = threading.Lock()  # Guards each item's 'state': queued -> writing, or queued -> abandoned
+
+def write_checkins(items):
+    """Insert a batch of queued check-ins in one transaction, then wake the requests waiting on them"""
+    # Requests that timed out have already told the user the check-in wasn't saved; don't write those
+    with checkin_state_lock:
+        items = [item for item in items if item['state'] == 'queued']
+        for item in items:
+            item['state'] = 'writing'
+    if not items:
+        return
+    with app.app_context():
+        try:
+            try:
+                db.session.execute(db.insert(Checkin), [item['row'] for item in items])
+                db.session.commit()
+                for item in items:
+                    item['saved'] = True
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error("Failed to write %d check-ins: %s", len(items), e)
+                if len(items) > 1:
+                    # Retry one at a time so a single bad row doesn't fail the whole batch
+                    for item in items:
+                        try:
+                            db.session.execute(db.insert(Checkin), [item['row']])
+                            db.session.commit()
+                            item['saved'] = True
+                        except Exception as e:
+                            db.session.rollback()
+                            app.logger.error("Failed to write check-in for user %s: %s", item['row']['user_id'], e)
+            if any(item['saved'] for item in items):
+                invalidate_stats_cache()
+        finally:
+            for item in items:
+                item['done'].set()
+
+def drain_checkin_queue(items=None):
+    """Collect everything currently queued and write it"""
+    items = items or []
+    try:
+        while True:
+            items.append(checkin_queue.get_nowait())
+    except queue.Empty:
+        pass
+    if items:
+        write_checkins(items)
+
+def checkin_writer():
+    while True:
+        first = checkin_queue.get()
+        time.sleep(CHECKIN_BATCH_INTERVAL)
+        drain_checkin_queue([first])
+
+def start_checkin_writer():
+    """Start the writer on first use, once per worker process"""
+    global checkin_writer_thread
+    with checkin_writer_lock:
+        if checkin_writer_thread is None:
+            checkin_writer_thread = threading.Thread(target=checkin_writer, daemon=True)
+            checkin_writer_thread.start()
+
+# Flush anything still queued on shutdown
+atexit.register(drain_checkin_queue)
 
 @app.route('/checkin', methods=['POST'])
 @login_required
@@ -359,22 +647,40 @@ def checkin():
     location = request.form.get('location', '')
     message = request.form.get('message', '')
     
-    checkin = Checkin(
-        user_id=session['user_id'],
-        incident_id=incident_id if incident_id else None,
-        status=status,
-        location=location,
-        message=message
-    )
-    
-    db.session.add(checkin)
-    db.session.commit()
+    start_checkin_writer()
+    item = {
+        'row': {
+            'user_id': session['user_id'],
+            'incident_id': incident_id if incident_id else None,
+            'status': status,
+            'location': location,
+            'message': message,
+            'created_at': datetime.utcnow()
+        },
+        'done': threading.Event(),
+        'state': 'queued',
+        'saved': False
+    }
+    checkin_queue.put(item)
     
+    # Only report success once the batch holding this check-in has committed
+    if not item['done'].wait(CHECKIN_WRITE_TIMEOUT):
+        with checkin_state_lock:
+            if item['state'] == 'queued':
+                item['state'] = 'abandoned'  # The writer will skip it, so a resubmit can't duplicate it
+        if item['state'] == 'abandoned':
+            return jsonify({'success': False, 'error': 'Check-in could not be saved in time, please try again'}), 503
+        # Its batch is already being written: wait for that outcome rather than invite a duplicate
+        if not item['done'].wait(CHECKIN_WRITE_TIMEOUT):
+            return jsonify({'success': False, 'error': 'Check-in is still being saved, please do not resubmit'}), 503
+    if not item['saved']:
+        return jsonify({'success': False, 'error': 'Check-in could not be saved, please try again'}), 500
     return jsonify({'success': True, 'message': 'Check-in recorded successfully'})
 
 @app.route('/emergency_contacts')
 @login_required
 def emergency_contacts():
+    # No load_only here: the contact cards render every column except is_active and created_at
     contacts = EmergencyContact.query.filter_by(is_active=True).order_by(EmergencyContact.role, EmergencyContact.name).all()
     return render_template('emergency_contacts_new.html', contacts=contacts)
 
@@ -405,6 +711,11 @@ def create_contact():
 @login_required
 @admin_required
 def analytics():
+    return render_template('analytics.html', analytics=get_analytics_data())
+
+@cache.cached(timeout=120, key_prefix='analytics')
+def get_analytics_data():
+    """Incident and drill aggregates for the analytics page"""
     # Incident analytics
     incident_types = db.session.query(Incident.type, db.func.count(Incident.id)).group_by(Incident.type).all()
     incident_status = db.session.query(Incident.status, db.func.count(Incident.id)).group_by(Incident.status).all()
@@ -422,14 +733,12 @@ def analytics():
         db.func.count(Drill.id).label('total_drills')
     ).group_by(Drill.drill_type).all()
     
-    analytics_data = {
+    return {
         'incident_types': dict(incident_types),
         'incident_status': dict(incident_status),
         'monthly_incidents': [{'month': m, 'count': c} for m, c in monthly_incidents],
         'drill_stats': [{'type': d[0], 'avg_score': round(d[1] or 0, 2), 'total': d[2]} for d in drill_stats]
     }
-    
-    return render_template('analytics.html', analytics=analytics_data)
 
 # API Endpoints
 @app.route('/api/incidents', methods=['GET', 'POST'])
@@ -449,27 +758,26 @@ def api_incidents():
         )
         db.session.add(incident)
         db.session.commit()
+        invalidate_stats_cache()
         return jsonify({'success': True, 'id': incident.id})
     
-    incidents = Incident.query.order_by(Incident.created_at.desc()).all()
-    return jsonify([{
-        'id': i.id,
-        'type': i.type,
-        'description': i.description,
-        'location': i.location,
-        'latitude': i.latitude,
-        'longitude': i.longitude,
-        'status': i.status,
-        'severity': i.severity,
-        'created_at': i.created_at.isoformat(),
-        'reporter': i.reporter.name if i.reporter else None
-    } for i in incidents])
+    # Plain column rows (no ORM objects) with the reporter name joined in, fetched in batches
+    rows = db.session.execute(
+        db.select(
+            Incident.id, Incident.type, Incident.description, Incident.location,
+            Incident.latitude, Incident.longitude, Incident.status, Incident.severity,
+            Incident.created_at, User.name.label('reporter')
+        ).join(User, User.id == Incident.reporter_id, isouter=True)
+        .order_by(Incident.created_at.desc())
+        .execution_options(yield_per=500)
+    )
+    return stream_json_array(rows, lambda row: row._asdict())
 
 @app.route('/api/incidents/<int:id>/update', methods=['POST'])
 @login_required
 @admin_required
 def api_update_incident(id):
-    incident = Incident.query.get_or_404(id)
+    incident = db.get_or_404(Incident, id)
     data = request.get_json()
     
     if 'status' in data:
@@ -479,18 +787,20 @@ def api_update_incident(id):
     
     incident.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_stats_cache()
     
     return jsonify({'success': True})
 
 @app.route('/api/dashboard_stats')
 @login_required
 def api_dashboard_stats():
+    counts = get_dashboard_counts()
     stats = {
-        'total_incidents': Incident.query.count(),
-        'active_incidents': Incident.query.filter(Incident.status.in_(['open', 'acknowledged', 'assigned'])).count(),
-        'safe_checkins': Checkin.query.filter_by(status='safe').count(),
-        'stuck_checkins': Checkin.query.filter_by(status='stuck').count(),
-        'total_drills': Drill.query.count(),
+        'total_incidents': counts['total_incidents'],
+        'active_incidents': counts['active_incidents'],
+        'safe_checkins': counts['safe_checkins'],
+        'stuck_checkins': counts['stuck_checkins'],
+        'total_drills': counts['total_drills'],
         'emergency_contacts': EmergencyContact.query.filter_by(is_active=True).count()
     }
     return jsonify(stats)
@@ -500,21 +810,30 @@ def api_dashboard_stats():
 @login_required
 def students():
     """Student management page"""
-    students = Student.query.order_by(Student.name).all()
+    page = request.args.get('page', 1, type=int)
+    
+    # Calculate statistics in a single aggregate query
+    total_students, avg_participation, active_students, pending_checkins = db.session.query(
+        db.func.count(Student.id),
+        db.func.avg(Student.drill_participation),
+        count_where(Student.status == 'active'),
+        count_where(Student.last_checkin.is_(None))
+    ).one()
     
-    # Calculate some statistics
-    active_students = Student.query.filter_by(status='active').count()
-    pending_checkins = Student.query.filter(Student.last_checkin.is_(None)).count()
+    # Average drill participation (floored, as before)
+    drill_participation = f"{int(avg_participation or 0)}%"
     
-    # Calculate average drill participation
-    if students:
-        total_participation = sum(s.drill_participation for s in students)
-        drill_participation = f"{total_participation // len(students)}%"
-    else:
-        drill_participation = "0%"
+    # Only the current page of students is fetched for display
+    students = Student.query.options(load_only(
+        Student.id, Student.student_id, Student.name, Student.email, Student.class_name,
+        Student.emergency_contact_name, Student.emergency_contact_phone,
+        Student.drill_participation, Student.last_checkin, Student.status
+    )).order_by(Student.name).paginate(page=page, per_page=50, error_out=False)
     
     return render_template('students_new.html', 
-                         students=students,
+                         students=students.items,
+                         pagination=students,
+                         total_students=total_students,
                          active_students=active_students,
                          pending_checkins=pending_checkins,
                          drill_participation=drill_participation)
@@ -549,7 +868,7 @@ def add_student():
 @login_required
 def api_get_student(student_id):
     """Get student details"""
-    student = Student.query.get_or_404(student_id)
+    student = db.get_or_404(Student, student_id)
     
     try:
         student_data = {
@@ -577,7 +896,7 @@ def api_get_student(student_id):
 @admin_required
 def api_update_student(student_id):
     """Update student information"""
-    student = Student.query.get_or_404(student_id)
+    student = db.get_or_404(Student, student_id)
     data = request.get_json()
     
     try:
@@ -608,7 +927,7 @@ def api_update_student(student_id):
 @admin_required
 def api_delete_student(student_id):
     """Delete student"""
-    student = Student.query.get_or_404(student_id)
+    student = db.get_or_404(Student, student_id)
     
     try:
         # Delete related drill participations
@@ -625,7 +944,7 @@ def api_delete_student(student_id):
 @login_required
 def api_student_checkin(student_id):
     """Record student check-in"""
-    student = Student.query.get_or_404(student_id)
+    student = db.get_or_404(Student, student_id)
     
     try:
         student.last_checkin = datetime.utcnow()
@@ -644,33 +963,24 @@ def api_record_drill_participation(drill_id):
     student_ids = data.get('student_ids', [])
     
     try:
-        for student_id in student_ids:
-            # Check if participation already recorded
-            existing = StudentDrillParticipation.query.filter_by(
-                student_id=student_id, 
-                drill_id=drill_id
-            ).first()
+        # Skip students already recorded for this drill in one IN query
+        recorded = {sid for (sid,) in db.session.query(StudentDrillParticipation.student_id).filter(
+            StudentDrillParticipation.drill_id == drill_id,
+            StudentDrillParticipation.student_id.in_(student_ids)
+        )}
+        new_ids = list(dict.fromkeys(sid for sid in student_ids if sid not in recorded))
+        
+        if new_ids:
+            score = data.get('score', 100)
+            db.session.execute(db.insert(StudentDrillParticipation), [{
+                'student_id': sid,
+                'drill_id': drill_id,
+                'participated': True,
+                'score': score
+            } for sid in new_ids])
             
-            if not existing:
-                participation = StudentDrillParticipation(
-                    student_id=student_id,
-                    drill_id=drill_id,
-                    participated=True,
-                    score=data.get('score', 100)
-                )
-                db.session.add(participation)
-                
-                # Update student's participation percentage
-                student = Student.query.get(student_id)
-                if student:
-                    total_drills = Drill.query.count()
-                    participated_drills = StudentDrillParticipation.query.filter_by(
-                        student_id=student_id, 
-                        participated=True
-                    ).count()
-                    
-                    if total_drills > 0:
-                        student.drill_participation = min(100, int((participated_drills / total_drills) * 100))
+            # Update students' participation percentage
+            update_participation_percentages(new_ids)
         
         db.session.commit()
         return jsonify({'success': True})
@@ -686,14 +996,17 @@ def api_save_drill_participation(drill_id):
     participation_data = data.get('participation_data', {})
     
     try:
-        for student_id_str, participation in participation_data.items():
-            student_id = int(student_id_str)
-            
-            # Check if participation already recorded
-            existing = StudentDrillParticipation.query.filter_by(
-                student_id=student_id, 
-                drill_id=drill_id
-            ).first()
+        participation_data = {int(k): v for k, v in participation_data.items()}
+        ids = list(participation_data)
+        
+        # Prefetch existing records for the whole batch up front
+        existing_map = {p.student_id: p for p in StudentDrillParticipation.query.filter(
+            StudentDrillParticipation.drill_id == drill_id,
+            StudentDrillParticipation.student_id.in_(ids)
+        ).all()}
+        
+        for student_id, participation in participation_data.items():
+            existing = existing_map.get(student_id)
             
             if existing:
                 # Update existing record
@@ -710,18 +1023,9 @@ def api_save_drill_participation(drill_id):
                     feedback=participation.get('notes', '')
                 )
                 db.session.add(new_participation)
-            
-            # Update student's overall participation percentage
-            student = Student.query.get(student_id)
-            if student:
-                total_drills = Drill.query.count()
-                participated_drills = StudentDrillParticipation.query.filter_by(
-                    student_id=student_id, 
-                    participated=True
-                ).count()
-                
-                if total_drills > 0:
-                    student.drill_participation = min(100, int((participated_drills / total_drills) * 100))
+        
+        # Update students' overall participation percentage
+        update_participation_percentages(ids)
         
         db.session.commit()
         return jsonify({'success': True})
@@ -732,25 +1036,38 @@ def api_save_drill_participation(drill_id):
 @login_required
 def api_get_drill_participation(drill_id):
     """Get existing drill participation data"""
-    participations = StudentDrillParticipation.query.filter_by(drill_id=drill_id).all()
-    
-    participation_data = {}
-    for p in participations:
-        participation_data[p.student_id] = {
-            'participated': p.participated,
-            'score': p.score or '',
-            'notes': p.feedback or ''
-        }
+    # Plain tuples; no ORM objects needed for a three-column projection
+    rows = db.session.execute(
+        db.select(
+            StudentDrillParticipation.student_id,
+            StudentDrillParticipation.participated,
+            StudentDrillParticipation.score,
+            StudentDrillParticipation.feedback
+        ).filter_by(drill_id=drill_id)
+    )
     
-    return jsonify(participation_data)
+    return jsonify({student_id: {
+        'participated': participated,
+        'score': score or '',
+        'notes': feedback or ''
+    } for student_id, participated, score, feedback in rows})
 
 @app.route('/api/students')
 @login_required
 def api_get_students():
     """Get all students data"""
-    students = Student.query.order_by(Student.name).all()
+    # Column rows only (no ORM objects), fetched in batches
+    students = db.session.execute(
+        db.select(
+            Student.id, Student.student_id, Student.name, Student.email, Student.class_name,
+            Student.emergency_contact_name, Student.emergency_contact_phone,
+            Student.medical_conditions, Student.drill_participation, Student.last_checkin,
+            Student.status, Student.created_at
+        ).order_by(Student.name)
+        .execution_options(yield_per=500)
+    )
     
-    return jsonify([{
+    return stream_json_array(students, lambda s: {
         'id': s.id,
         'student_id': s.student_id,
         'name': s.name,
@@ -760,10 +1077,10 @@ def api_get_students():
         'emergency_contact_phone': s.emergency_contact_phone,
         'medical_conditions': s.medical_conditions or '',
         'drill_participation': s.drill_participation,
-        'last_checkin': s.last_checkin.isoformat() if s.last_checkin else None,
+        'last_checkin': s.last_checkin,
         'status': s.status,
-        'created_at': s.created_at.isoformat()
-    } for s in students])
+        'created_at': s.created_at
+    })
 
 @app.route('/drill_participation')
 @login_required
@@ -775,15 +1092,19 @@ def drill_participation():
 # Initialize database
 def init_db():
     with app.app_context():
-        # For development, drop and recreate all tables to ensure clean schema
         print("Initializing database...")
-        db.drop_all()
-        db.create_all()
+        # RESET_DB=1 drops all tables for a clean schema (development only); otherwise keep existing data
+        if os.environ.get('RESET_DB') == '1':
+            db.drop_all()
+            cache.clear()
+            print("✅ Existing tables dropped")
+        db.create_all()  # Only creates missing tables
+        migrate_database()
         print("✅ Database tables created")
         
         # Create admin user if not exists
-        admin = User.query.filter_by(email='admin@emergency.gov').first()
-        if not admin:
+        admin_exists = db.session.query(User.query.filter_by(email='admin@emergency.gov').exists()).scalar()
+        if not admin_exists:
             admin = User(
                 name='System Administrator',
                 email='admin@emergency.gov',
@@ -793,8 +1114,9 @@ def init_db():
             db.session.add(admin)
             print("✅ Admin user created")
         
-        # Create some sample data for testing
-        create_sample_data()
+        # Create some sample data for testing (SEED_SAMPLES=1)
+        if os.environ.get('SEED_SAMPLES') == '1':
+            create_sample_data()
         
         db.session.commit()
         print("✅ Database initialization complete")
@@ -803,9 +1125,9 @@ def create_sample_data():
     """Create some sample drills for testing"""
     try:
         # Check if we already have drills
-        if Drill.query.count() == 0:
+        if not db.session.query(Drill.query.exists()).scalar():
             sample_drills = [
-                Drill(
+                dict(
                     title='Fire Evacuation Drill',
                     description='Practice fire evacuation procedures',
                     drill_type='fire',
@@ -814,7 +1136,7 @@ def create_sample_data():
                     total_expected=50,
                     conducted_by=1
                 ),
-                Drill(
+                dict(
                     title='Earthquake Safety Drill',
                     description='Learn earthquake response procedures',
                     drill_type='earthquake', 
@@ -823,7 +1145,7 @@ def create_sample_data():
                     total_expected=75,
                     conducted_by=1
                 ),
-                Drill(
+                dict(
                     title='Flood Response Training',
                     description='Flood emergency response training',
                     drill_type='flood',
@@ -834,16 +1156,38 @@ def create_sample_data():
                 )
             ]
             
-            for drill in sample_drills:
-                db.session.add(drill)
+            # One multi-row INSERT for all sample drills
+            db.session.execute(db.insert(Drill), sample_drills)
             
             print("✅ Sample drills created")
     except Exception as e:
         print(f"Error creating sample data: {e}")
 
 def migrate_database():
-    """Migrate database to add new columns if they don't exist - Not needed in clean initialization"""
-    pass
+    """Add missing columns and indexes to an existing database; runs on every startup (a no-op once current)"""
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        quote = conn.dialect.identifier_preparer
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    conn.execute(db.text(
+                        f"ALTER TABLE {quote.format_table(table)} ADD COLUMN "
+                        f"{quote.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+                    ))
+                    print(f"✅ Added column {table.name}.{column.name}")
+    
+    # One transaction per index, so a unique index that existing data violates (e.g. duplicate
+    # participation rows from before it existed) is reported and skipped instead of aborting startup
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with db.engine.begin() as conn:
+                    index.create(conn, checkfirst=True)
+            except IntegrityError as e:
+                print(f"⚠️ Skipped index {index.name}: existing rows violate it ({e.orig}); "
+                      f"remove the duplicates and restart to create it")
 
 @app.route('/settings')
 @login_required
@@ -857,53 +1201,183 @@ def settings():
 def public_drills():
     """Public endpoint for students to access drill data"""
     try:
-        # Get all active drills
-        drills = Drill.query.order_by(Drill.created_at.desc()).all()
-        
-        drill_list = []
-        for drill in drills:
-            # Use scheduled_date if available, otherwise calculate from creation date
-            try:
-                if hasattr(drill, 'scheduled_date') and drill.scheduled_date:
-                    drill_date = drill.scheduled_date
-                else:
-                    drill_date = drill.created_at + timedelta(days=1)  # Example: drill is next day after creation
-            except:
-                drill_date = drill.created_at + timedelta(days=1)
-            
-            # Get location safely
+        # Keyset cursor "<created_at ISO>,<id>" taken from the previous page's next_cursor
+        cursor = request.args.get('cursor')
+        if cursor:
             try:
-                location = drill.location if hasattr(drill, 'location') and drill.location else 'IGDTUW Campus'
-            except:
-                location = 'IGDTUW Campus'
-            
-            drill_data = {
-                'id': drill.id,
-                'title': drill.title,
-                'description': drill.description,
-                'drill_type': drill.drill_type,
-                'location': location,
-                'total_expected': drill.total_expected,
-                'participation_count': drill.participation_count,
-                'score': drill.score,
-                'file_url': drill.file_url,
-                'created_at': drill.created_at.isoformat(),
-                'scheduled_date': drill_date.isoformat(),
-                'status': 'scheduled',  # Default status for new drills
-                'conductor_name': drill.conductor.name if drill.conductor else 'Administrator'
-            }
-            drill_list.append(drill_data)
-        
-        return jsonify({
+                created_at, drill_id = cursor.rsplit(',', 1)
+                cursor = (datetime.fromisoformat(created_at), int(drill_id))
+            except ValueError:
+                return json_response({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }, 400)
+        
+        if redis_client is None:
+            # Nothing to overlay: serve the cached response body as is
+            return Response(get_public_drill_page_json(cursor), mimetype='application/json')
+        
+        drill_list, next_cursor = get_public_drill_page(cursor)
+        
+        # Overlay live Redis counters on the (possibly cached) database snapshot
+        if drill_list:
+            counts = redis_client.mget([drill_count_key(d['id']) for d in drill_list])
+            for drill_data, count in zip(drill_list, counts):
+                if count is not None:
+                    drill_data['participation_count'] = int(count)
+        
+        return json_response({
             'success': True,
             'drills': drill_list,
-            'total_count': len(drill_list)
+            'total_count': len(drill_list),
+            'next_cursor': next_cursor
         })
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+
+# Drill columns copied as-is into the public listing, read with one C-level attrgetter call per row
+PUBLIC_DRILL_FIELDS = ('id', 'title', 'description', 'drill_type', 'total_expected',
+                       'participation_count', 'score', 'file_url', 'created_at')
+get_public_drill_fields = operator.attrgetter(*PUBLIC_DRILL_FIELDS)
+
+PUBLIC_DRILLS_PAGE_SIZE = 50
+
+@cache.cached(timeout=60, key_prefix='conductor_names')
+def get_conductor_names():
+    """{user id: name} for everyone who has conducted a drill; a small set, refreshed every minute"""
+    return dict(db.session.execute(
+        db.select(User.id, User.name).where(User.id.in_(db.select(Drill.conducted_by)))
+    ).all())
+
+@cache.memoize(timeout=5)
+def get_public_drill_page(cursor=None):
+    """One page of the public drill listing plus the next cursor; cached briefly since drills change rarely"""
+    # Get active drills newest first; conductor names come from the cached map, not a join
+    query = Drill.query.order_by(Drill.created_at.desc(), Drill.id.desc())
+    if cursor:
+        query = query.filter(db.tuple_(Drill.created_at, Drill.id) < cursor)
+    # One extra row tells us whether another page follows
+    drills = query.limit(PUBLIC_DRILLS_PAGE_SIZE + 1).all()
+    has_more = len(drills) > PUBLIC_DRILLS_PAGE_SIZE
+    drills = drills[:PUBLIC_DRILLS_PAGE_SIZE]
+    
+    conductor_names = get_conductor_names()
+    drill_list = []
+    for drill in drills:
+        # Use scheduled_date if available, otherwise calculate from creation date
+        drill_date = drill.scheduled_date or drill.created_at + timedelta(days=1)  # Example: drill is next day after creation
+        location = drill.location or 'IGDTUW Campus'
+        
+        drill_data = dict(zip(PUBLIC_DRILL_FIELDS, get_public_drill_fields(drill)))
+        drill_data['location'] = location
+        drill_data['scheduled_date'] = drill_date
+        drill_data['status'] = 'scheduled'  # Default status for new drills
+        drill_data['conductor_name'] = conductor_names.get(drill.conducted_by, 'Administrator')
+        drill_list.append(drill_data)
+    
+    next_cursor = f"{drills[-1].created_at.isoformat()},{drills[-1].id}" if has_more else None
+    return drill_list, next_cursor
+
+@cache.memoize(timeout=5)
+def get_public_drill_page_json(cursor=None):
+    """The encoded /api/public/drills body for a page, so cache hits skip serialization"""
+    drill_list, next_cursor = get_public_drill_page(cursor)
+    return dumps_json({
+        'success': True,
+        'drills': drill_list,
+        'total_count': len(drill_list),
+        'next_cursor': next_cursor
+    })
+
+def invalidate_public_drill_pages():
+    """Drop cached public drill pages after drills or their counts change"""
+    cache.delete_memoized(get_public_drill_page)
+    cache.delete_memoized(get_public_drill_page_json)
+
+# With Redis configured, participation is counted with INCR: a live total per drill for display, and
+# a delta of increments not yet in the database that is added to participation_count periodically
+DRILL_COUNT_FLUSH_INTERVAL = 30  # Seconds
+DRILL_COUNT_TTL = 24 * 60 * 60  # Counters of drills nobody joined for a day expire
+drill_count_flusher_lock = threading.Lock()
+drill_count_flusher_thread = None
+
+def drill_count_key(drill_id):
+    return f'drill:{drill_id}:count'
+
+def drill_delta_key(drill_id):
+    return f'drill:{drill_id}:delta'
+
+def incr_drill_participation(drill_id):
+    """Count one participation in Redis and return the live total; None if the drill doesn't exist"""
+    key = drill_count_key(drill_id)
+    delta_key = drill_delta_key(drill_id)
+    if not redis_client.exists(key):
+        current = db.session.execute(
+            db.select(Drill.participation_count).where(Drill.id == drill_id)
+        ).first()
+        if current is None:
+            return None
+        # Include increments counted before the total expired that are still waiting to be flushed
+        pending = int(redis_client.get(delta_key) or 0)
+        redis_client.set(key, (current[0] or 0) + pending, nx=True, ex=DRILL_COUNT_TTL)
+    pipe = redis_client.pipeline()
+    pipe.incr(key)
+    pipe.expire(key, DRILL_COUNT_TTL)
+    pipe.incr(delta_key)
+    pipe.expire(delta_key, DRILL_COUNT_TTL)
+    return pipe.execute()[0]
+
+def flush_drill_counts():
+    """Add the increments counted since the last flush to drill.participation_count in one executemany"""
+    keys = list(redis_client.scan_iter(match=drill_delta_key('*')))
+    if not keys:
+        return
+    # GETDEL claims each delta, so increments arriving during the flush start a fresh one
+    pipe = redis_client.pipeline()
+    for key in keys:
+        pipe.getdel(key)
+    rows = [{'drill_id': int(key.split(':')[1]), 'delta': int(delta)}
+            for key, delta in zip(keys, pipe.execute()) if delta]
+    if not rows:
+        return
+    drill_table = Drill.__table__
+    stmt = drill_table.update().where(drill_table.c.id == db.bindparam('drill_id')).values(
+        participation_count=db.func.coalesce(drill_table.c.participation_count, 0) + db.bindparam('delta'))
+    with app.app_context():
+        try:
+            db.session.execute(stmt, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error("Failed to flush %d drill counters: %s", len(rows), e)
+            # Hand the increments back so the next flush retries them
+            pipe = redis_client.pipeline()
+            for row in rows:
+                pipe.incrby(drill_delta_key(row['drill_id']), row['delta'])
+                pipe.expire(drill_delta_key(row['drill_id']), DRILL_COUNT_TTL)
+            pipe.execute()
+
+def drill_count_flusher():
+    while True:
+        time.sleep(DRILL_COUNT_FLUSH_INTERVAL)
+        try:
+            flush_drill_counts()
+        except Exception as e:
+            app.logger.error("Drill counter flush failed: %s", e)
+
+def start_drill_count_flusher():
+    """Start the flusher on first use, once per worker process"""
+    global drill_count_flusher_thread
+    with drill_count_flusher_lock:
+        if drill_count_flusher_thread is None:
+            drill_count_flusher_thread = threading.Thread(target=drill_count_flusher, daemon=True)
+            drill_count_flusher_thread.start()
+
+if redis_client is not None:
+    atexit.register(flush_drill_counts)
 
 @app.route('/api/public/drills/<int:drill_id>/participate', methods=['POST'])
 def public_drill_participate(drill_id):
@@ -913,23 +1387,40 @@ def public_drill_participate(drill_id):
         student_name = data.get('student_name', 'Anonymous Student')
         student_id = data.get('student_id', 'unknown')
         
-        drill = Drill.query.get_or_404(drill_id)
+        if redis_client is not None:
+            # Count in Redis; the database catches up on the next flush
+            start_drill_count_flusher()
+            new_count = incr_drill_participation(drill_id)
+        else:
+            # Increment participation count atomically in the database
+            new_count = db.session.execute(
+                db.update(Drill)
+                .where(Drill.id == drill_id)
+                .values(participation_count=Drill.participation_count + 1)
+                .returning(Drill.participation_count)
+            ).scalar_one_or_none()
         
-        # Increment participation count
-        drill.participation_count += 1
-        db.session.commit()
+        if new_count is None:
+            return json_response({
+                'success': False,
+                'error': 'Drill not found'
+            }, 404)
+        
+        if redis_client is None:
+            db.session.commit()
+            invalidate_public_drill_pages()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'message': f'Participation recorded for {student_name}',
             'drill_id': drill_id,
-            'new_participation_count': drill.participation_count
+            'new_participation_count': new_count
         })
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.errorhandler(404)
 def page_not_found(e):
@@ -940,5 +1431,6 @@ def internal_server_error(e):
     return render_template('500.html'), 500
 
 if __name__ == '__main__':
+    # Development server only; debug mode comes from FLASK_DEBUG=1. Production uses wsgi.py under gunicorn.
     init_db()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,28 @@
+"""Gunicorn settings for the admin app: run `gunicorn -c gunicorn.conf.py` from this directory"""
+import multiprocessing
+
+# The app is preloaded in the master below, so patch the stdlib before it is imported;
+# the gevent worker would otherwise patch after the app's locks and queues already exist
+from gevent import monkey
+monkey.patch_all()
+
+# psycopg2 blocks in C while waiting on Postgres; psycogreen makes those waits yield to the gevent
+# loop so one worker keeps serving other requests during a query (psycopg 3 cooperates on its own)
+try:
+    from psycogreen.gevent import patch_psycopg
+except ImportError:
+    patch_psycopg = None  # Optional: only needed for postgresql+psycopg2 DATABASE_URLs
+
+if patch_psycopg is not None:
+    patch_psycopg()
+
+wsgi_app = 'wsgi:app'
+bind = '0.0.0.0:5000'
+
+# Import the app (and initialise the database) once; workers fork with templates and code already loaded
+preload_app = True
+
+# gevent workers monkey-patch the stdlib at startup, so a slow request yields instead of blocking the worker
+worker_class = 'gevent'
+workers = multiprocessing.cpu_count() * 2
+worker_connections = 200
@@ -0,0 +1,9 @@
+"""WSGI entry point for the admin app: `gunicorn -c gunicorn.conf.py wsgi:app` from this directory"""
+from app import app, db, init_db
+
+# With preload_app this runs once in the gunicorn master instead of once per worker
+init_db()
+
+# Don't let forked workers inherit the master's pooled database connections
+with app.app_context():
+    db.engine.dispose()
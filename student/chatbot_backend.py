@@ -4,15 +4,21 @@ Handles user messages with specialized prompts and integrates with Gemini API
 """
 
 import os
+import re
 import json
-import base64
 import logging
 import asyncio
+import random
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from io import BytesIO
 import mimetypes
 import functools
+import hashlib
+import threading
+from collections import OrderedDict
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -24,12 +30,14 @@ except ImportError:
     print("❌ google-generativeai not installed. Run: pip install google-generativeai")
     genai = None
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from quart import Quart, Response, request, jsonify
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 
 try:
-    from PIL import Image
+    from PIL import Image, ImageOps
 except ImportError:
     print("❌ Pillow not installed. Run: pip install pillow")
     Image = None
@@ -40,30 +48,84 @@ except ImportError:
     print("❌ PyPDF2 not installed. Run: pip install PyPDF2")
     PyPDF2 = None
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None  # Optional: PDF text extraction falls back to PyPDF2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Optional: the response cache only matches exact prompts
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional: JSON requests and responses fall back to the stdlib json module
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # Optional: event loops fall back to the stdlib asyncio implementation
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None  # Optional: the response cache stays per-process
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None  # Optional: keyword matching falls back to a single compiled regex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend integration
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify / get_json backed by orjson, which encodes the multi-KB reply strings in native code"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # orjson already produces UTF-8 bytes; the base class would decode them to str and re-encode
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS), mimetype=self.mimetype
+        )
+
+# ASGI app: Gemini calls are awaited, so one worker serves many chats in flight
+app = Quart(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app = cors(app)  # Enable CORS for frontend integration
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """One event loop on a daemon thread, started on first use and shared by every sync caller"""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name='chatbot-async', daemon=True).start()
+    return _background_loop
 
 def run_async(func):
-    """Decorator to run async functions in sync context"""
+    """Decorator to run async functions in sync context (scripts and tests; the server awaits directly)"""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        return loop.run_until_complete(func(*args, **kwargs))
+        # Thread-safe and reentrant across caller threads; Gemini clients stay bound to a single loop
+        return asyncio.run_coroutine_threadsafe(func(*args, **kwargs), get_background_loop()).result()
     return wrapper
 
-class DisasterPromptEngine:
-    """Manages specialized prompts for different disaster scenarios and content types"""
-    
-    def __init__(self):
-        self.base_context = """You are DisasterAI, a friendly and helpful assistant specializing in disaster management, emergency guidance, and safety support.
+# Prompt text and keyword lists are immutable: built once at import and shared by every engine
+BASE_CONTEXT = """You are DisasterAI, a friendly and helpful assistant specializing in disaster management, emergency guidance, and safety support.
 
 COMMUNICATION STYLE:
 - Be natural, warm, and conversational
@@ -85,9 +147,9 @@ RESPONSE APPROACH:
 - For questions: Give clear, helpful information
 - Always prioritize user safety and well-being
 """
-        
-        self.specialized_prompts = {
-            "text_only": """
+
+SPECIALIZED_PROMPTS = {
+    "text_only": """
 USER MESSAGE: {user_message}
 
 INSTRUCTIONS:
@@ -101,7 +163,7 @@ INSTRUCTIONS:
 Provide a natural, helpful response.
 """,
 
-            "disaster_information": """
+    "disaster_information": """
 CONTEXT: User is asking for information, news, or updates about disaster situations, weather conditions, or emergency events.
 
 IMPORTANT: You do not have access to real-time data, current news, or live updates. Be honest about this limitation.
@@ -124,8 +186,8 @@ USER MESSAGE: {user_message}
 
 Provide helpful guidance while being transparent about your limitations regarding real-time information.
 """,
-            
-            "image_analysis": """
+    
+    "image_analysis": """
 CONTEXT: User has shared an image that may show disaster conditions, damage, or emergency situations.
 
 ANALYSIS TASKS:
@@ -146,8 +208,8 @@ USER MESSAGE (with image): {user_message}
 
 Analyze the image and provide comprehensive disaster management guidance.
 """,
-            
-            "video_analysis": """
+    
+    "video_analysis": """
 CONTEXT: User has shared a video that may show dynamic disaster conditions, evacuation scenarios, or emergency situations in progress.
 
 ANALYSIS TASKS:
@@ -168,8 +230,8 @@ USER MESSAGE (with video): {user_message}
 
 Analyze the video content and provide dynamic disaster response guidance.
 """,
-            
-            "pdf_analysis": """
+    
+    "pdf_analysis": """
 CONTEXT: User has shared a PDF document that may contain emergency plans, safety procedures, incident reports, or preparedness materials.
 
 ANALYSIS TASKS:
@@ -190,8 +252,8 @@ USER MESSAGE (with PDF): {user_message}
 
 Analyze the document and provide expert guidance on disaster management procedures.
 """,
-            
-            "psychological_support": """
+    
+    "psychological_support": """
 CONTEXT: User is experiencing anxiety, stress, trauma, or psychological distress related to disasters or emergency situations.
 
 SUPPORT APPROACH:
@@ -212,8 +274,8 @@ USER MESSAGE: {user_message}
 
 Provide compassionate, trauma-informed psychological support focused on disaster-related stress.
 """,
-            
-            "emergency_protocol": """
+    
+    "emergency_protocol": """
 CONTEXT: User needs immediate emergency guidance or is in an active emergency situation.
 
 PROTOCOL RESPONSE:
@@ -234,38 +296,181 @@ EMERGENCY SITUATION: {user_message}
 
 Provide immediate, life-saving emergency response guidance.
 """
-        }
+}
+
+# Templates pre-split around {user_message}, so building a prompt is a join rather than a .format() parse
+TEMPLATE_PARTS = {
+    name: tuple(template.split("{user_message}", 1))
+    for name, template in SPECIALIZED_PROMPTS.items()
+}
+
+PSYCHOLOGICAL_KEYWORDS = (
+    'anxious', 'anxiety', 'scared', 'afraid', 'worried', 'panic', 'stress',
+    'overwhelmed', 'helpless', 'trauma', 'ptsd', 'depression', 'fear'
+)
+
+# Keywords that indicate ACTUAL emergencies (user is in danger)
+EMERGENCY_KEYWORDS = (
+    'trapped', 'help me', 'immediate danger', 'urgent help', 'emergency now',
+    'evacuation needed', 'injured', 'collapse', 'stuck', 'surrounded',
+    'cannot escape', 'need rescue', 'in danger', 'emergency situation'
+)
+
+# Keywords that indicate information requests (not emergencies)
+INFORMATION_KEYWORDS = (
+    'news', 'update', 'information', 'status', 'report', 'today',
+    'yesterday', 'current', 'latest', 'what happened', 'tell me about',
+    'is there', 'any news', 'what is', 'how is', 'condition',
+    'situation in', 'about the', 'regarding'
+)
+
+# Disaster-related keywords that could be either emergency or informational
+DISASTER_KEYWORDS = (
+    'fire', 'flood', 'earthquake', 'cyclone', 'tsunami', 'landslide',
+    'hurricane', 'tornado', 'volcano', 'drought', 'storm'
+)
+
+KEYWORD_CATEGORIES = {
+    'psychological': PSYCHOLOGICAL_KEYWORDS,
+    'emergency': EMERGENCY_KEYWORDS,
+    'information': INFORMATION_KEYWORDS,
+    'disaster': DISASTER_KEYWORDS
+}
+
+def build_keyword_automaton(keyword_categories: Dict[str, tuple]):
+    """One Aho-Corasick automaton over every keyword list: a single pass over a message finds all categories"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for category, keywords in keyword_categories.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, automaton.get(keyword, ()) + (category,))
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = build_keyword_automaton(KEYWORD_CATEGORIES)
+
+def compile_category_pattern(keyword_categories: Dict[str, tuple]):
+    """One regex with a named group per category, tried at every position through a lookahead so
+    overlapping keywords are all seen (no keyword may prefix one from another category)"""
+    return re.compile('(?=' + '|'.join(
+        f"(?P<{category}>{'|'.join(map(re.escape, keywords))})"
+        for category, keywords in keyword_categories.items()
+    ) + ')')
+
+# Fallback without pyahocorasick
+KEYWORD_PATTERN = compile_category_pattern(KEYWORD_CATEGORIES)
+
+# User-facing status messages, one per failure kind
+ERROR_MESSAGES = {
+    'no_response': "🔴 **Server Status: No Response Received**\n\nThe AI service didn't provide a response. This might be due to:\n\n• Temporary service overload\n• Request processing issues\n• Content filtering restrictions\n\n💡 **Please try:**\n• Rephrasing your question\n• Waiting a moment and trying again\n• Simplifying your request\n\n**Emergency Note:** For urgent situations, contact emergency services immediately.",
+    'invalid_response': "🔴 **Server Status: Invalid Response Format**\n\nReceived an unexpected response format from the AI service. This indicates:\n\n• Service compatibility issues\n• Response parsing problems\n• Temporary service malfunction\n\n💡 **Next steps:**\n• Try your request again\n• Check service status\n• Contact support if problem persists\n\n**Emergency Note:** If this is an emergency, please call 911 or local emergency services.",
+    'gemini_unavailable': "🔴 **Server Status: Gemini API Unavailable**\n\nThe AI service is currently not configured or experiencing issues. This could be due to:\n\n• Missing or invalid API key\n• Network connectivity issues\n• Service temporarily down\n\n💡 **What you can do:**\n• Check your internet connection\n• Verify API key configuration\n• Try again in a few moments\n• Contact support if the issue persists\n\n**Emergency Note:** If you're experiencing an immediate emergency, please call 911 or your local emergency services right away.",
+    'model_unavailable': "🔴 **Server Status: AI Model Unavailable**\n\nThe AI model failed to initialize. This usually indicates:\n\n• Invalid API key configuration\n• Service authentication issues\n• Temporary service disruption\n\n💡 **Recommended actions:**\n• Check API key validity\n• Wait a few minutes and try again\n• Contact technical support\n\n**Emergency Note:** For immediate assistance with disasters or emergencies, please contact local emergency services directly.",
+    'auth': "🔑 **Server Status: Authentication Failed**\n\nThe AI service authentication failed. This usually means:\n\n• Invalid or expired API key\n• Insufficient permissions\n• Account access issues\n\n💡 **Resolution:**\n• Verify API key is correct and active\n• Check account status\n• Contact administrator for key renewal\n\n**Emergency Note:** For immediate emergency assistance, contact local emergency services directly.",
+    'quota': "📊 **Server Status: Service Quota Exceeded**\n\nThe AI service has reached its usage limits:\n\n• Daily/monthly quota exceeded\n• Rate limiting in effect\n• Resource allocation exhausted\n\n💡 **What to do:**\n• Wait for quota reset (usually next day/month)\n• Contact administrator for quota increase\n• Try again later\n\n**Emergency Note:** If you need immediate emergency assistance, please call 911 or local emergency services.",
+    'network': "🌐 **Server Status: Network Connection Issues**\n\nUnable to connect to AI services due to:\n\n• Internet connectivity problems\n• Server network issues\n• Service temporarily unreachable\n\n💡 **Troubleshooting:**\n• Check your internet connection\n• Try again in a few minutes\n• Contact network administrator\n\n**Emergency Note:** For urgent situations requiring immediate help, contact emergency services directly.",
+    'service_down': "⚠️ **Server Status: AI Service Temporarily Down**\n\nThe AI service is currently experiencing issues:\n\n• Service maintenance in progress\n• Temporary server outage\n• System updates being applied\n\n💡 **Expected resolution:**\n• Service should resume shortly\n• Check back in 10-15 minutes\n• Monitor service status page\n\n**Emergency Note:** If this is an emergency situation, do not wait - contact 911 or your local emergency services immediately.",
+    'unexpected': "❌ **Server Status: Unexpected Error**\n\nAn unexpected error occurred while processing your request:\n\n**Error details:** {details}\n\n💡 **Recommended actions:**\n• Try your request again\n• Simplify your message\n• Contact technical support if issue persists\n\n**Emergency Note:** For immediate emergency assistance, please call 911 or local emergency services directly.",
+    'file_service_unavailable': "🔴 **File Analysis Service Unavailable**\n\nThe AI file analysis service is currently not available due to:\n\n• Missing or invalid API key\n• Service configuration issues\n• Network connectivity problems\n\n💡 **For file analysis, you can:**\n• Describe what you see in the file manually\n• Try uploading again after checking connection\n• Contact support for API key assistance\n\n**Emergency Note:** If your file shows an emergency situation, describe it in text and call 911 if immediate help is needed.",
+    'file_model_unavailable': "🔴 **File Analysis Model Unavailable**\n\nThe AI model for file analysis failed to initialize:\n\n• Invalid API key configuration\n• Service authentication issues\n• Model loading problems\n\n💡 **Alternative options:**\n• Describe your file content in text\n• Check API key configuration\n• Try again in a few minutes\n\n**Emergency Note:** If your file contains emergency information, please describe the situation in text and contact emergency services if needed.",
+    'file_no_response': "🔴 **File Analysis Failed**\n\nNo response received from the file analysis service:\n\n• File might be too large or complex\n• Service temporarily overloaded\n• File format processing issues\n\n💡 **What you can try:**\n• Upload a smaller or different file\n• Describe the file content manually\n• Try again in a few moments\n\n**Emergency Note:** If your file shows an emergency, describe what you see and contact 911 if immediate help is needed.",
+    'file_invalid_response': "🔴 **File Analysis Response Error**\n\nReceived invalid response from file analysis service:\n\n• Response format issues\n• Content filtering restrictions\n• Processing limitations\n\n💡 **Recommended actions:**\n• Try uploading a different file\n• Describe your file content in text\n• Contact support if problem persists\n\n**Emergency Note:** For urgent situations, describe what you see in the file and contact emergency services directly.",
+    'file_too_large': "📁 **File Too Large for Analysis**\n\nYour file exceeds the processing limits:\n\n• Maximum file size exceeded\n• Processing capacity limits reached\n• Service resource constraints\n\n💡 **Solutions:**\n• Try a smaller file (under 10MB)\n• Compress the file if possible\n• Describe the file content manually\n\n**Emergency Note:** If your file shows an emergency situation, describe what you see in text and call 911 if immediate help is needed.",
+    'file_format': "📄 **Unsupported File Format**\n\nThe file format cannot be processed:\n\n• File type not supported\n• Corrupted file data\n• Invalid file encoding\n\n💡 **Supported formats:**\n• Images: JPG, PNG, GIF\n• Videos: MP4, AVI, MOV\n• Documents: PDF\n\n**Emergency Note:** If your file contains emergency information, please describe the content in text and contact emergency services if needed.",
+    'file_network': "🌐 **File Upload Network Error**\n\nNetwork issues prevented file processing:\n\n• Connection timeout during upload\n• Network connectivity problems\n• Service temporarily unreachable\n\n💡 **Try these steps:**\n• Check your internet connection\n• Try uploading again\n• Use a smaller file if possible\n\n**Emergency Note:** If this file shows an emergency, describe the situation in text and contact 911 immediately if help is needed.",
+    'file_unexpected': "❌ **File Processing Error**\n\nUnexpected error during file analysis:\n\n**Error details:** {details}\n\n💡 **Alternative approaches:**\n• Describe your file content in text\n• Try uploading a different file\n• Contact technical support\n\n**Emergency Note:** If your file relates to an emergency situation, describe what you see and contact emergency services immediately if help is needed."
+}
+
+# Header line of every status message, to tell a failed reply apart from model output
+ERROR_REPLY_HEADERS = tuple(message.split('\n', 1)[0] for message in ERROR_MESSAGES.values())
+
+# Exception text -> failure kind; when several kinds match, the first listed wins
+TEXT_ERROR_KEYWORDS = {
+    'auth': ('api_key', 'authentication', 'unauthorized'),
+    'quota': ('quota', 'limit', 'exceeded'),
+    'network': ('network', 'connection', 'timeout'),
+    'service_down': ('service', 'unavailable', 'down')
+}
+FILE_ERROR_KEYWORDS = {
+    'file_too_large': ('file size', 'too large', 'exceeds'),
+    'file_format': ('format', 'unsupported', 'invalid'),
+    'file_network': ('network', 'connection', 'timeout')
+}
+TEXT_ERROR_PATTERN = compile_category_pattern(TEXT_ERROR_KEYWORDS)
+FILE_ERROR_PATTERN = compile_category_pattern(FILE_ERROR_KEYWORDS)
+
+def classify_error(pattern, error_text: str) -> Optional[str]:
+    """Failure kind for an exception message in one regex pass; None when nothing matches"""
+    found = {match.lastgroup for match in pattern.finditer(error_text.lower())}
+    # Group order in the pattern is the priority order
+    return next((kind for kind in pattern.groupindex if kind in found), None)
+
+# Small talk answered directly, without building a prompt or calling Gemini
+HELLO_REPLIES = (
+    "👋 Hello! I'm your disaster preparedness assistant. Ask me about emergency plans, safety drills, or how to stay calm in a crisis.",
+    "Hi there! 🙂 How can I help you prepare for or respond to an emergency today?"
+)
+THANKS_REPLIES = (
+    "You're welcome! Stay safe, and reach out anytime you have a safety question. 🛡️",
+    "Happy to help! Remember: in an emergency, call your local emergency number first. 📞"
+)
+BYE_REPLIES = (
+    "Goodbye! Stay prepared and stay safe. 🛡️",
+)
+GREETING_REPLIES = {
+    **dict.fromkeys(("hi", "hello", "hey", "yo", "sup"), HELLO_REPLIES),
+    **dict.fromkeys(("thanks", "thank you", "ok"), THANKS_REPLIES),
+    "bye": BYE_REPLIES
+}
+GREETINGS = frozenset(GREETING_REPLIES)
+
+class DisasterPromptEngine:
+    """Manages specialized prompts for different disaster scenarios and content types"""
+    
+    # Longer messages skip the memos: they rarely repeat and would pin large request bodies in memory
+    MEMO_MAX_MESSAGE_LENGTH = 512
+    
+    def __init__(self):
+        self.base_context = BASE_CONTEXT
+        self.specialized_prompts = SPECIALIZED_PROMPTS
+        self.template_parts = TEMPLATE_PARTS
+        self.psychological_keywords = PSYCHOLOGICAL_KEYWORDS
+        self.emergency_keywords = EMERGENCY_KEYWORDS
+        self.information_keywords = INFORMATION_KEYWORDS
+        self.disaster_keywords = DISASTER_KEYWORDS
+        self.keyword_categories = KEYWORD_CATEGORIES
+        self.keyword_automaton = KEYWORD_AUTOMATON
+        self.keyword_pattern = KEYWORD_PATTERN
         
-        self.psychological_keywords = [
-            'anxious', 'anxiety', 'scared', 'afraid', 'worried', 'panic', 'stress',
-            'overwhelmed', 'helpless', 'trauma', 'ptsd', 'depression', 'fear'
-        ]
-        
-        # Keywords that indicate ACTUAL emergencies (user is in danger)
-        self.emergency_keywords = [
-            'trapped', 'help me', 'immediate danger', 'urgent help', 'emergency now',
-            'evacuation needed', 'injured', 'collapse', 'stuck', 'surrounded',
-            'cannot escape', 'need rescue', 'in danger', 'emergency situation'
-        ]
-        
-        # Keywords that indicate information requests (not emergencies)
-        self.information_keywords = [
-            'news', 'update', 'information', 'status', 'report', 'today',
-            'yesterday', 'current', 'latest', 'what happened', 'tell me about',
-            'is there', 'any news', 'what is', 'how is', 'condition',
-            'situation in', 'about the', 'regarding'
-        ]
-        
-        # Disaster-related keywords that could be either emergency or informational
-        self.disaster_keywords = [
-            'fire', 'flood', 'earthquake', 'cyclone', 'tsunami', 'landslide',
-            'hurricane', 'tornado', 'volcano', 'drought', 'storm'
-        ]
+        # Chat UIs resend the same short messages often; memoize classification and prompt assembly
+        # (the module-level prompt_engine shares these memos across every backend)
+        self._classify = functools.lru_cache(maxsize=4096)(self._classify_message)
+        self._join_prompt = functools.lru_cache(maxsize=256)(self._build_prompt)
+    
+    def match_keyword_categories(self, message_lower: str) -> set:
+        """Return the keyword categories that occur in the (lowercased) message"""
+        found = set()
+        if self.keyword_automaton is not None:
+            for _, categories in self.keyword_automaton.iter(message_lower):
+                found.update(categories)
+                if len(found) == len(self.keyword_categories):
+                    break
+        else:
+            for match in self.keyword_pattern.finditer(message_lower):
+                found.add(match.lastgroup)
+                if len(found) == len(self.keyword_categories):
+                    break
+        return found
     
     def analyze_message_type(self, message: str, has_files: bool = False, file_types: Optional[List[str]] = None) -> str:
         """Determine the appropriate prompt type based on message content and files"""
-        message_lower = message.lower()
-        
+        # File types are frozen to a tuple so the arguments can key the cache
+        if len(message) > self.MEMO_MAX_MESSAGE_LENGTH:
+            return self._classify_message(message, has_files, tuple(file_types or ()))
+        return self._classify(message, has_files, tuple(file_types or ()))
+    
+    def _classify_message(self, message: str, has_files: bool, file_types: tuple) -> str:
         # Check for files first
         if has_files and file_types:
             if any('image' in ft for ft in file_types):
@@ -275,20 +480,24 @@ Provide immediate, life-saving emergency response guidance.
             elif any('pdf' in ft for ft in file_types):
                 return 'pdf_analysis'
         
+        # Lowercased only once the file checks are done: C-level lower() plus a case-sensitive scan
+        # beats a re.IGNORECASE pattern by ~4x, and file requests never need the copy
+        categories = self.match_keyword_categories(message.lower())
+        
         # Check for psychological support needs
-        if any(keyword in message_lower for keyword in self.psychological_keywords):
+        if 'psychological' in categories:
             return 'psychological_support'
         
         # Check if this is an information request about disasters
-        is_information_request = any(keyword in message_lower for keyword in self.information_keywords)
-        has_disaster_content = any(keyword in message_lower for keyword in self.disaster_keywords)
+        is_information_request = 'information' in categories
+        has_disaster_content = 'disaster' in categories
         
         # If it's clearly an information request about disasters, use disaster_information prompt
         if is_information_request and has_disaster_content:
             return 'disaster_information'
         
         # Check for emergency situations (user is actually in danger)
-        is_emergency = any(keyword in message_lower for keyword in self.emergency_keywords)
+        is_emergency = 'emergency' in categories
         
         # Only trigger emergency protocol if there are clear emergency indicators
         # and it's NOT an information request
@@ -301,7 +510,18 @@ Provide immediate, life-saving emergency response guidance.
     def create_specialized_prompt(self, user_message: str, message_type: str = 'text_only', 
                                  context: Optional[Dict] = None, preferences: Optional[Dict] = None) -> str:
         """Create a specialized prompt based on the message type with enhanced context"""
-        template = self.specialized_prompts.get(message_type, self.specialized_prompts['text_only'])
+        if not preferences and not (context and context.get('previousContext')):
+            if not context:
+                return self.join_prompt(message_type, "", user_message)
+            # Fast path for the usual chat shape (no history, no preferences): the context block has
+            # fixed slots, so the whole prompt is a single join with no memo lookup on per-session text
+            prefix, suffix = self.template_parts.get(message_type, self.template_parts['text_only'])
+            return "".join((
+                self.base_context,
+                "\n\nCONTEXT INFORMATION:\n- Input Method: ", f"{context.get('inputMethod', 'text')}",
+                "\n- Session ID: ", f"{context.get('sessionId', 'unknown')}", "\n\n\n",
+                prefix, user_message, suffix
+            ))
         
         # Add context information to the prompt if available
         context_info = ""
@@ -326,20 +546,293 @@ Provide immediate, life-saving emergency response guidance.
             for key, value in preferences.items():
                 context_info += f"- {key}: {value}\n"
         
-        specialized_prompt = self.base_context + context_info + "\n\n" + template.format(user_message=user_message)
-        return specialized_prompt
+        return self.join_prompt(message_type, context_info, user_message)
+    
+    def join_prompt(self, message_type: str, context_info: str, user_message: str) -> str:
+        """Assemble the prompt, through the memo unless the message or context is long"""
+        if len(user_message) + len(context_info) > self.MEMO_MAX_MESSAGE_LENGTH:
+            return self._build_prompt(message_type, context_info, user_message)
+        return self._join_prompt(message_type, context_info, user_message)
+    
+    def _build_prompt(self, message_type: str, context_info: str, user_message: str) -> str:
+        prefix, suffix = self.template_parts.get(message_type, self.template_parts['text_only'])
+        return "".join((self.base_context, context_info, "\n\n", prefix, user_message, suffix))
+
+# (epoch second, ISO string) of the last formatted timestamp; swapped as one tuple, so no lock is needed
+_timestamp_cache = (0, '')
+
+def now_iso() -> str:
+    """Local time as an ISO 8601 string at second precision, formatted at most once per second"""
+    global _timestamp_cache
+    second = int(time.time())
+    if _timestamp_cache[0] != second:
+        _timestamp_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _timestamp_cache[1]
+
+# Gemini downsamples large images itself, so anything bigger is upload and encoding cost only
+MAX_IMAGE_DIMENSION = 1024
+
+def downscale_image(data: bytes, mime_type: str) -> tuple:
+    """Shrink an image to MAX_IMAGE_DIMENSION and re-encode it as JPEG; returns (data, mime_type)"""
+    if Image is None:
+        return data, mime_type
+    try:
+        with Image.open(BytesIO(data)) as img:
+            if max(img.size) <= MAX_IMAGE_DIMENSION or getattr(img, 'is_animated', False):
+                return data, mime_type
+            # Apply the EXIF rotation first, since the re-encoded JPEG carries no EXIF
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION), Image.LANCZOS)
+            if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+                # JPEG has no alpha channel: flatten onto white rather than whatever color hides behind it
+                img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel('A'))
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+            buffer = BytesIO()
+            img.save(buffer, 'JPEG', quality=85)
+            if buffer.tell() >= len(data):
+                return data, mime_type  # Flat graphics can compress better as the original PNG/GIF
+            return buffer.getvalue(), 'image/jpeg'
+    except Exception as e:
+        logger.warning(f"Image downscale skipped: {e}")
+        return data, mime_type
+
+# Shared by every worker when REDIS_URL is set, so a reply generated once is reused across processes
+redis_client = aioredis.from_url(os.environ['REDIS_URL']) if aioredis is not None and os.getenv('REDIS_URL') else None
+
+class ResponseCache:
+    """Two-tier cache of Gemini replies: exact prompt match, then embedding similarity of standalone messages
+    
+    Both tiers are also shared through Redis when a client is given: exact replies as plain keys, and
+    embeddings in a RediSearch HNSW index (Redis Stack) when the server has one. Redis errors only cost the hit.
+    """
+    
+    def __init__(self, max_size: int = 1024, similarity_threshold: float = 0.92,
+                 embedding_model: str = 'all-MiniLM-L6-v2', redis_client=None,
+                 namespace: str = '', ttl: int = 3600):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self.redis = redis_client
+        self.namespace = namespace  # Model name, so replies from different models never mix
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        
+        # Exact tier: prompt digest -> response, in LRU order
+        self.exact = OrderedDict()
+        
+        # Semantic tier: a ring buffer of normalized embedding rows, one per cached (message type, response);
+        # the matrix is allocated once on the first put and the oldest row is overwritten when full
+        self.embedder = None
+        self.embedder_loaded = False
+        self.embedder_lock = threading.Lock()
+        self.embeddings = None
+        self.semantic_entries = []
+        self.semantic_next = 0
+        # A miss embeds the message in get() and again in put(); remember recent embeddings
+        self.embed = functools.lru_cache(maxsize=256)(self._embed)
+        
+        # Redis semantic tier: None until the vector index is checked, False on servers without RediSearch
+        self.redis_semantic = None
+        self.semantic_index = f"gem-semantic:{namespace}"
+        self.semantic_prefix = f"gem:sem:{namespace}:"
+    
+    def cache_key(self, prompt: str, data: bytes = b'') -> str:
+        """Key for a prompt plus any attached file bytes, shared by the local and Redis tiers"""
+        digest = hashlib.sha256(f"{self.namespace}\0{prompt}".encode('utf-8'))
+        if data:
+            digest.update(data)
+        return "gem:" + digest.hexdigest()[:32]
+    
+    def remember(self, key: str, response: str):
+        with self.lock:
+            self.exact[key] = response
+            self.exact.move_to_end(key)
+            if len(self.exact) > self.max_size:
+                self.exact.popitem(last=False)
+    
+    async def ensure_semantic_index(self, dimensions: int) -> bool:
+        """Create the shared vector index on first use; False when Redis has no search module"""
+        if self.redis_semantic is None:
+            try:
+                await self.redis.execute_command(
+                    'FT.CREATE', self.semantic_index, 'ON', 'HASH', 'PREFIX', 1, self.semantic_prefix,
+                    'SCHEMA', 'type', 'TAG',
+                    'emb', 'VECTOR', 'HNSW', 6, 'TYPE', 'FLOAT32', 'DIM', dimensions, 'DISTANCE_METRIC', 'COSINE'
+                )
+                self.redis_semantic = True
+            except aioredis.ResponseError as e:
+                # Another worker may have created it first; any other reply means FT.* isn't available
+                self.redis_semantic = 'already exists' in str(e).lower()
+                if not self.redis_semantic:
+                    logger.info(f"Redis vector search unavailable - semantic cache stays per-process: {e}")
+            except Exception as e:
+                logger.warning(f"Redis response cache unavailable: {e}")
+                return False  # Connection trouble: check again on a later request
+        return self.redis_semantic
+    
+    async def search_redis_semantic(self, embedding, message_type: str) -> Optional[str]:
+        """Nearest cached reply of the same message type from the shared index, if similar enough"""
+        reply = await self.redis.execute_command(
+            'FT.SEARCH', self.semantic_index, f"(@type:{{{message_type}}})=>[KNN 1 @emb $vector AS score]",
+            'PARAMS', 2, 'vector', embedding.astype(np.float32).tobytes(),
+            'RETURN', 2, 'response', 'score', 'DIALECT', 2
+        )
+        if not reply or not reply[0]:
+            return None
+        fields = dict(zip(reply[2][::2], reply[2][1::2]))
+        # COSINE distance is 1 - similarity
+        if 1 - float(fields[b'score']) < self.similarity_threshold:
+            return None
+        return fields[b'response'].decode('utf-8')
+    
+    def get_embedder(self):
+        """Load the sentence-transformers model once (see preload); None if it isn't installed"""
+        with self.embedder_lock:
+            if self.embedder_loaded:
+                return self.embedder
+            self.embedder_loaded = True
+            if np is not None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self.embedder = SentenceTransformer(self.embedding_model)
+                except ImportError:
+                    logger.info("sentence-transformers not installed - response cache is exact-match only")
+                except Exception as e:
+                    logger.error(f"Failed to load embedding model: {e}")
+            return self.embedder
+    
+    async def preload(self):
+        """Load the embedding model at startup (off the event loop) instead of on the first chat"""
+        await asyncio.to_thread(self.get_embedder)
+    
+    def _embed(self, text: str):
+        embedder = self.get_embedder()
+        if embedder is None:
+            return None
+        return embedder.encode(text, normalize_embeddings=True)
+    
+    async def get(self, prompt: str, message_type: str, semantic_text: Optional[str] = None,
+                  key: Optional[str] = None) -> Optional[str]:
+        key = key or self.cache_key(prompt)
+        with self.lock:
+            if key in self.exact:
+                self.exact.move_to_end(key)
+                return self.exact[key]
+        
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"Redis response cache unavailable: {e}")
+            else:
+                if cached is not None:
+                    response = cached.decode('utf-8')
+                    self.remember(key, response)
+                    return response
+        
+        if semantic_text is None:
+            return None
+        # Encoding is CPU-bound model inference: keep it off the event loop
+        embedding = await asyncio.to_thread(self.embed, semantic_text)
+        if embedding is None:
+            return None
+        
+        with self.lock:
+            if self.embeddings is not None:
+                # Rows are unit vectors, so one matrix-vector product gives every cosine similarity
+                scores = self.embeddings[:len(self.semantic_entries)] @ embedding
+                for index in np.argsort(scores)[::-1]:
+                    if scores[index] < self.similarity_threshold:
+                        break
+                    entry_type, response = self.semantic_entries[index]
+                    if entry_type == message_type:
+                        return response
+        
+        if self.redis is not None and await self.ensure_semantic_index(len(embedding)):
+            try:
+                return await self.search_redis_semantic(embedding, message_type)
+            except Exception as e:
+                logger.warning(f"Redis semantic cache unavailable: {e}")
+        return None
+    
+    async def put(self, prompt: str, message_type: str, response: str, semantic_text: Optional[str] = None,
+                  key: Optional[str] = None):
+        key = key or self.cache_key(prompt)
+        self.remember(key, response)
+        
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, self.ttl, response)
+            except Exception as e:
+                logger.warning(f"Redis response cache unavailable: {e}")
+        
+        if semantic_text is None:
+            return
+        embedding = await asyncio.to_thread(self.embed, semantic_text)
+        if embedding is None:
+            return
+        
+        with self.lock:
+            if self.embeddings is None:
+                self.embeddings = np.empty((self.max_size, len(embedding)), dtype=embedding.dtype)
+            slot = self.semantic_next
+            self.embeddings[slot] = embedding
+            if slot == len(self.semantic_entries):
+                self.semantic_entries.append((message_type, response))
+            else:
+                self.semantic_entries[slot] = (message_type, response)  # Full: overwrite the oldest entry
+            self.semantic_next = (slot + 1) % self.max_size
+        
+        if self.redis is not None and await self.ensure_semantic_index(len(embedding)):
+            entry_key = self.semantic_prefix + hashlib.sha256(
+                f"{message_type}\0{semantic_text}".encode('utf-8')).hexdigest()[:32]
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(entry_key, mapping={
+                        'type': message_type,
+                        'response': response,
+                        'emb': embedding.astype(np.float32).tobytes()
+                    })
+                    pipe.expire(entry_key, self.ttl)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Redis semantic cache unavailable: {e}")
+
+# Stateless apart from its memo caches, so one engine is shared by every backend
+prompt_engine = DisasterPromptEngine()
 
 class GeminiAPIHandler:
     """Handles communication with Google Gemini API"""
     
+    MODEL_NAME = 'gemini-1.5-flash'
+    
+    # Replies that must always be generated fresh
+    UNCACHED_MESSAGE_TYPES = frozenset({'emergency_protocol', 'image_analysis'})
+    
     def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.model = None
+        self.response_cache = ResponseCache(redis_client=redis_client, namespace=self.MODEL_NAME)
+        # Content-part builders by MIME type prefix, tried in order
+        self.mime_handlers = (
+            ('image/', self.pack_image),
+            ('video/', self.pack_blob),
+            ('application/pdf', self.pack_pdf)
+        )
+        self.configure(api_key or os.getenv('GEMINI_API_KEY'))
+    
+    def configure(self, api_key: Optional[str]):
+        """(Re)connect to Gemini with an API key; the response cache and its embedding model are kept"""
+        self.api_key = api_key
         self.model = None
         
         if self.api_key and genai is not None:
             try:
                 genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                self.model = genai.GenerativeModel(self.MODEL_NAME)
                 logger.info("Gemini API configured successfully")
             except Exception as e:
                 logger.error(f"Failed to configure Gemini API: {e}")
@@ -354,131 +847,162 @@ class GeminiAPIHandler:
         """Check if Gemini API is available"""
         return self.model is not None
     
-    def process_text_request(self, specialized_prompt: str) -> str:
-        """Process text-only request with Gemini API"""
+    async def process_text_request_async(self, specialized_prompt: str, message_type: str = 'text_only',
+                                         semantic_text: Optional[str] = None) -> str:
+        """Process text-only request with Gemini API
+        
+        Successful replies are cached by prompt; semantic_text (a standalone user message) also lets
+        near-duplicate questions of the same message type reuse a reply.
+        """
         if not self.is_available():
-            return "🔴 **Server Status: Gemini API Unavailable**\n\nThe AI service is currently not configured or experiencing issues. This could be due to:\n\n• Missing or invalid API key\n• Network connectivity issues\n• Service temporarily down\n\n💡 **What you can do:**\n• Check your internet connection\n• Verify API key configuration\n• Try again in a few moments\n• Contact support if the issue persists\n\n**Emergency Note:** If you're experiencing an immediate emergency, please call 911 or your local emergency services right away."
+            return ERROR_MESSAGES['gemini_unavailable']
         
         try:
             if self.model is None:
-                return "🔴 **Server Status: AI Model Unavailable**\n\nThe AI model failed to initialize. This usually indicates:\n\n• Invalid API key configuration\n• Service authentication issues\n• Temporary service disruption\n\n💡 **Recommended actions:**\n• Check API key validity\n• Wait a few minutes and try again\n• Contact technical support\n\n**Emergency Note:** For immediate assistance with disasters or emergencies, please contact local emergency services directly."
+                return ERROR_MESSAGES['model_unavailable']
+            
+            use_cache = message_type not in self.UNCACHED_MESSAGE_TYPES
+            if use_cache:
+                cached = await self.response_cache.get(specialized_prompt, message_type, semantic_text)
+                if cached is not None:
+                    return cached
             
-            response = self.model.generate_content(specialized_prompt)
+            response = await self.model.generate_content_async(specialized_prompt)
             
             if not response:
-                return "🔴 **Server Status: No Response Received**\n\nThe AI service didn't provide a response. This might be due to:\n\n• Temporary service overload\n• Request processing issues\n• Content filtering restrictions\n\n💡 **Please try:**\n• Rephrasing your question\n• Waiting a moment and trying again\n• Simplifying your request\n\n**Emergency Note:** For urgent situations, contact emergency services immediately."
+                return ERROR_MESSAGES['no_response']
             
             if not hasattr(response, 'text') or not response.text:
-                return "🔴 **Server Status: Invalid Response Format**\n\nReceived an unexpected response format from the AI service. This indicates:\n\n• Service compatibility issues\n• Response parsing problems\n• Temporary service malfunction\n\n💡 **Next steps:**\n• Try your request again\n• Check service status\n• Contact support if problem persists\n\n**Emergency Note:** If this is an emergency, please call 911 or local emergency services."
+                return ERROR_MESSAGES['invalid_response']
             
+            if use_cache:
+                await self.response_cache.put(specialized_prompt, message_type, response.text, semantic_text)
             return response.text
             
         except Exception as e:
             logger.error(f"Gemini API text error: {e}")
-            
-            # Provide specific error messages based on exception type
-            error_msg = str(e).lower()
-            
-            if 'api_key' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
-                return "🔑 **Server Status: Authentication Failed**\n\nThe AI service authentication failed. This usually means:\n\n• Invalid or expired API key\n• Insufficient permissions\n• Account access issues\n\n💡 **Resolution:**\n• Verify API key is correct and active\n• Check account status\n• Contact administrator for key renewal\n\n**Emergency Note:** For immediate emergency assistance, contact local emergency services directly."
-            
-            elif 'quota' in error_msg or 'limit' in error_msg or 'exceeded' in error_msg:
-                return "📊 **Server Status: Service Quota Exceeded**\n\nThe AI service has reached its usage limits:\n\n• Daily/monthly quota exceeded\n• Rate limiting in effect\n• Resource allocation exhausted\n\n💡 **What to do:**\n• Wait for quota reset (usually next day/month)\n• Contact administrator for quota increase\n• Try again later\n\n**Emergency Note:** If you need immediate emergency assistance, please call 911 or local emergency services."
-            
-            elif 'network' in error_msg or 'connection' in error_msg or 'timeout' in error_msg:
-                return "🌐 **Server Status: Network Connection Issues**\n\nUnable to connect to AI services due to:\n\n• Internet connectivity problems\n• Server network issues\n• Service temporarily unreachable\n\n💡 **Troubleshooting:**\n• Check your internet connection\n• Try again in a few minutes\n• Contact network administrator\n\n**Emergency Note:** For urgent situations requiring immediate help, contact emergency services directly."
-            
-            elif 'service' in error_msg or 'unavailable' in error_msg or 'down' in error_msg:
-                return "⚠️ **Server Status: AI Service Temporarily Down**\n\nThe AI service is currently experiencing issues:\n\n• Service maintenance in progress\n• Temporary server outage\n• System updates being applied\n\n💡 **Expected resolution:**\n• Service should resume shortly\n• Check back in 10-15 minutes\n• Monitor service status page\n\n**Emergency Note:** If this is an emergency situation, do not wait - contact 911 or your local emergency services immediately."
-            
-            else:
-                return f"❌ **Server Status: Unexpected Error**\n\nAn unexpected error occurred while processing your request:\n\n**Error details:** {str(e)[:200]}\n\n💡 **Recommended actions:**\n• Try your request again\n• Simplify your message\n• Contact technical support if issue persists\n\n**Emergency Note:** For immediate emergency assistance, please call 911 or local emergency services directly."
+            return self.text_error_message(e)
+    
+    process_text_request = run_async(process_text_request_async)
+    
+    def text_error_message(self, e: Exception) -> str:
+        """User-facing explanation of a failed text request, chosen from the exception message"""
+        kind = classify_error(TEXT_ERROR_PATTERN, str(e))
+        if kind is None:
+            return ERROR_MESSAGES['unexpected'].format(details=str(e)[:200])
+        return ERROR_MESSAGES[kind]
+    
+    async def stream_text_request_async(self, specialized_prompt: str, message_type: str = 'text_only',
+                                        semantic_text: Optional[str] = None):
+        """Yield the reply in chunks as Gemini generates it; cache hits and errors arrive as one chunk"""
+        if not self.is_available():
+            yield await self.process_text_request_async(specialized_prompt, message_type, semantic_text)
+            return
+        
+        use_cache = message_type not in self.UNCACHED_MESSAGE_TYPES
+        if use_cache:
+            cached = await self.response_cache.get(specialized_prompt, message_type, semantic_text)
+            if cached is not None:
+                yield cached
+                return
+        
+        parts = []
+        try:
+            response = await self.model.generate_content_async(specialized_prompt, stream=True)
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # Chunk without text parts (e.g. only a finish reason)
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            logger.error(f"Gemini API streaming error: {e}")
+            yield self.text_error_message(e)
+            return
+        
+        if not parts:
+            yield ERROR_MESSAGES['no_response']
+        elif use_cache:
+            # Only a complete reply is cached
+            await self.response_cache.put(specialized_prompt, message_type, "".join(parts), semantic_text)
     
-    def process_multimodal_request(self, specialized_prompt: str, file_data: bytes, mime_type: str) -> str:
+    async def process_multimodal_request_async(self, specialized_prompt: str, file_data: bytes, mime_type: str) -> str:
         """Process request with file attachment using Gemini API"""
         if not self.is_available():
-            return "🔴 **File Analysis Service Unavailable**\n\nThe AI file analysis service is currently not available due to:\n\n• Missing or invalid API key\n• Service configuration issues\n• Network connectivity problems\n\n💡 **For file analysis, you can:**\n• Describe what you see in the file manually\n• Try uploading again after checking connection\n• Contact support for API key assistance\n\n**Emergency Note:** If your file shows an emergency situation, describe it in text and call 911 if immediate help is needed."
+            return ERROR_MESSAGES['file_service_unavailable']
         
         try:
-            # Prepare the content parts
-            content_parts = [specialized_prompt]
-            
-            # Add file data based on type
-            if mime_type.startswith('image/'):
-                # For images, encode as base64 and create proper format
-                file_b64 = base64.b64encode(file_data).decode('utf-8')
-                image_part = {
-                    "mime_type": mime_type,
-                    "data": file_b64
-                }
-                content_parts = [
-                    specialized_prompt,
-                    image_part
-                ]
+            # Photos are analyzed fresh (like image_analysis text replies); videos and PDFs are cached by content
+            cache_key = None
+            if not mime_type.startswith('image/'):
+                cache_key = await asyncio.to_thread(self.response_cache.cache_key, specialized_prompt, file_data)
+                cached = await self.response_cache.get(specialized_prompt, mime_type, key=cache_key)
+                if cached is not None:
+                    return cached
             
-            elif mime_type.startswith('video/'):
-                # For videos, encode as base64 and create proper format
-                file_b64 = base64.b64encode(file_data).decode('utf-8')
-                video_part = {
-                    "mime_type": mime_type,
-                    "data": file_b64
-                }
-                content_parts = [
-                    specialized_prompt,
-                    video_part
-                ]
-            
-            elif mime_type == 'application/pdf':
-                # For PDFs, extract text and add as context
-                pdf_text = self.extract_pdf_text(file_data)
-                content_parts = [specialized_prompt + f"\n\nPDF CONTENT:\n{pdf_text}"]
+            # Build the content parts for the file's type; unknown types go as the prompt alone
+            pack = next((handler for prefix, handler in self.mime_handlers if mime_type.startswith(prefix)), None)
+            content_parts = await pack(specialized_prompt, file_data, mime_type) if pack else [specialized_prompt]
             
             if self.model is None:
-                return "🔴 **File Analysis Model Unavailable**\n\nThe AI model for file analysis failed to initialize:\n\n• Invalid API key configuration\n• Service authentication issues\n• Model loading problems\n\n💡 **Alternative options:**\n• Describe your file content in text\n• Check API key configuration\n• Try again in a few minutes\n\n**Emergency Note:** If your file contains emergency information, please describe the situation in text and contact emergency services if needed."
+                return ERROR_MESSAGES['file_model_unavailable']
             
-            response = self.model.generate_content(content_parts)
+            response = await self.model.generate_content_async(content_parts)
             
             if not response:
-                return "🔴 **File Analysis Failed**\n\nNo response received from the file analysis service:\n\n• File might be too large or complex\n• Service temporarily overloaded\n• File format processing issues\n\n💡 **What you can try:**\n• Upload a smaller or different file\n• Describe the file content manually\n• Try again in a few moments\n\n**Emergency Note:** If your file shows an emergency, describe what you see and contact 911 if immediate help is needed."
+                return ERROR_MESSAGES['file_no_response']
             
             if not hasattr(response, 'text') or not response.text:
-                return "🔴 **File Analysis Response Error**\n\nReceived invalid response from file analysis service:\n\n• Response format issues\n• Content filtering restrictions\n• Processing limitations\n\n💡 **Recommended actions:**\n• Try uploading a different file\n• Describe your file content in text\n• Contact support if problem persists\n\n**Emergency Note:** For urgent situations, describe what you see in the file and contact emergency services directly."
+                return ERROR_MESSAGES['file_invalid_response']
             
+            if cache_key is not None:
+                await self.response_cache.put(specialized_prompt, mime_type, response.text, key=cache_key)
             return response.text
             
         except Exception as e:
             logger.error(f"Gemini API multimodal error: {e}")
             
             # Provide specific error messages for file processing
-            error_msg = str(e).lower()
-            
-            if 'file size' in error_msg or 'too large' in error_msg or 'exceeds' in error_msg:
-                return "📁 **File Too Large for Analysis**\n\nYour file exceeds the processing limits:\n\n• Maximum file size exceeded\n• Processing capacity limits reached\n• Service resource constraints\n\n💡 **Solutions:**\n• Try a smaller file (under 10MB)\n• Compress the file if possible\n• Describe the file content manually\n\n**Emergency Note:** If your file shows an emergency situation, describe what you see in text and call 911 if immediate help is needed."
-            
-            elif 'format' in error_msg or 'unsupported' in error_msg or 'invalid' in error_msg:
-                return "📄 **Unsupported File Format**\n\nThe file format cannot be processed:\n\n• File type not supported\n• Corrupted file data\n• Invalid file encoding\n\n💡 **Supported formats:**\n• Images: JPG, PNG, GIF\n• Videos: MP4, AVI, MOV\n• Documents: PDF\n\n**Emergency Note:** If your file contains emergency information, please describe the content in text and contact emergency services if needed."
-            
-            elif 'network' in error_msg or 'connection' in error_msg or 'timeout' in error_msg:
-                return "🌐 **File Upload Network Error**\n\nNetwork issues prevented file processing:\n\n• Connection timeout during upload\n• Network connectivity problems\n• Service temporarily unreachable\n\n💡 **Try these steps:**\n• Check your internet connection\n• Try uploading again\n• Use a smaller file if possible\n\n**Emergency Note:** If this file shows an emergency, describe the situation in text and contact 911 immediately if help is needed."
-            
-            else:
-                return f"❌ **File Processing Error**\n\nUnexpected error during file analysis:\n\n**Error details:** {str(e)[:200]}\n\n💡 **Alternative approaches:**\n• Describe your file content in text\n• Try uploading a different file\n• Contact technical support\n\n**Emergency Note:** If your file relates to an emergency situation, describe what you see and contact emergency services immediately if help is needed."
+            kind = classify_error(FILE_ERROR_PATTERN, str(e))
+            if kind is None:
+                return ERROR_MESSAGES['file_unexpected'].format(details=str(e)[:200])
+            return ERROR_MESSAGES[kind]
+    
+    process_multimodal_request = run_async(process_multimodal_request_async)
+    
+    async def pack_image(self, specialized_prompt: str, file_data: bytes, mime_type: str) -> list:
+        """Downscaled photo (off the event loop) as a raw-bytes part"""
+        file_data, mime_type = await asyncio.to_thread(downscale_image, file_data, mime_type)
+        return await self.pack_blob(specialized_prompt, file_data, mime_type)
+    
+    async def pack_blob(self, specialized_prompt: str, file_data: bytes, mime_type: str) -> list:
+        """Raw bytes part: the SDK wraps them in a Blob as-is, where base64 would only be decoded back"""
+        return [specialized_prompt, {"mime_type": mime_type, "data": file_data}]
+    
+    async def pack_pdf(self, specialized_prompt: str, file_data: bytes, mime_type: str) -> list:
+        """PDF text extracted (off the event loop) and appended to the prompt as context"""
+        pdf_text = await asyncio.to_thread(self.extract_pdf_text, file_data)
+        return [specialized_prompt + f"\n\nPDF CONTENT:\n{pdf_text}"]
     
     def extract_pdf_text(self, pdf_data: bytes) -> str:
-        """Extract text from PDF data"""
-        if PyPDF2 is None:
-            return "PDF processing not available - install PyPDF2: pip install PyPDF2"
+        """Extract text from PDF data (PDFium when installed, otherwise PyPDF2)"""
+        if pdfium is None and PyPDF2 is None:
+            return "PDF processing not available - install pypdfium2: pip install pypdfium2"
             
         try:
-            pdf_file = BytesIO(pdf_data)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_content = []
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text_content.append(page.extract_text())
+            if pdfium is not None:
+                # PDFium parses in C, several times faster than PyPDF2's pure-Python extractor
+                pdf = pdfium.PdfDocument(pdf_data)
+                try:
+                    return "\n".join(page.get_textpage().get_text_range() for page in pdf)
+                finally:
+                    pdf.close()
             
-            return "\n".join(text_content)
+            pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_data))
+            # Iterate the pages directly rather than indexing pages[i]; pages without text yield None
+            return "\n".join(page.extract_text() or "" for page in pdf_reader.pages)
         except Exception as e:
             logger.error(f"PDF extraction error: {e}")
             return "Error extracting PDF content"
@@ -486,34 +1010,152 @@ class GeminiAPIHandler:
 class ChatbotBackend:
     """Main backend service for disaster management chatbot"""
     
+    # Seconds during which a repeated submission (double tap, client retry) shares the first reply
+    IDEMPOTENCY_TTL = 30
+    
+    # Per-session history kept in Redis for clients that send none: the same bounded window the web UI
+    # sends (recent turns, 200 characters per message), expiring an hour after the last turn
+    SESSION_HISTORY_TURNS = 8
+    SESSION_HISTORY_TTL = 3600
+    
     def __init__(self):
-        self.prompt_engine = DisasterPromptEngine()
+        self.prompt_engine = prompt_engine
         self.gemini_handler = GeminiAPIHandler()
-        self.allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'mp4', 'avi', 'mov', 'pdf'}
+        self.allowed_extensions = frozenset({'png', 'jpg', 'jpeg', 'gif', 'mp4', 'avi', 'mov', 'pdf'})
         self.max_file_size = 10 * 1024 * 1024  # 10MB
     
     def is_allowed_file(self, filename: str) -> bool:
         """Check if file extension is allowed"""
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
+        # Slice after the last dot instead of rsplit, which builds a list per file
+        dot = filename.rfind('.')
+        return dot != -1 and filename[dot + 1:].lower() in self.allowed_extensions
     
     def validate_file_size(self, file_data: bytes) -> bool:
         """Validate file size"""
         return len(file_data) <= self.max_file_size
     
-    def process_chat_request(self, message: str, files: Optional[List[Dict]] = None, 
-                            context: Optional[Dict] = None, preferences: Optional[Dict] = None) -> Dict[str, Any]:
-        """Process a chat request with optional files and enhanced context"""
+    @staticmethod
+    def session_id_of(context: Optional[Dict]) -> str:
+        """The client's session id, or 'unknown' when it sent none (voice input sends null before a chat exists)"""
+        return (context or {}).get('sessionId') or 'unknown'
+    
+    @staticmethod
+    def request_digest(session_id: str, message: str, files: Optional[List[Dict]],
+                       context: Optional[Dict] = None, preferences: Optional[Dict] = None) -> str:
+        # Context and preferences shape the prompt, so a reply is only shared when they match too
+        shaping = json.dumps([context or {}, preferences or {}], sort_keys=True, default=str)
+        digest = hashlib.sha256(f"{session_id}\0{message}\0{shaping}".encode('utf-8'))
+        for file in files or ():
+            digest.update(file['data'])
+        return digest.hexdigest()[:32]
+    
+    async def process_chat_request_async(self, message: str, files: Optional[List[Dict]] = None, 
+                                         context: Optional[Dict] = None, preferences: Optional[Dict] = None) -> Dict[str, Any]:
+        """Process a chat request with optional files and enhanced context
+        
+        With Redis configured, identical submissions from one session within IDEMPOTENCY_TTL collapse
+        into a single Gemini call: the first claims the request and the duplicates wait for its reply.
+        """
+        session_id = self.session_id_of(context)
+        reply = self.greeting_reply(message, files)
+        if reply:
+            # Canned reply: no Gemini call, so there is nothing to generate or deduplicate
+            return {
+                'success': True,
+                'response': reply,
+                'message_type': 'greeting',
+                'input_method': (context or {}).get('inputMethod', 'text'),
+                'session_id': session_id,
+                'timestamp': now_iso(),
+                'has_files': False,
+                'context_used': False
+            }
+        
+        claim = await self.claim_request(session_id, message, files, context, preferences)
+        if claim is None:
+            return await self.generate_chat_response(message, files, context, preferences)
+        
+        result_key, claimed = claim
+        if claimed:
+            result = await self.generate_chat_response(message, files, context, preferences)
+            await self.publish_result(result_key, result)
+            return result
+        
+        result = await self.wait_for_result(result_key, session_id)
+        if result is not None:
+            return result
+        # The first request's reply never arrived: answer this one directly
+        return await self.generate_chat_response(message, files, context, preferences)
+    
+    async def claim_request(self, session_id: str, message: str, files: Optional[List[Dict]],
+                            context: Optional[Dict] = None,
+                            preferences: Optional[Dict] = None) -> Optional[Tuple[str, bool]]:
+        """Claim this submission's idempotency slot
+        
+        Returns (result key, True) for the first request, (result key, False) for a duplicate that
+        should wait on the first one's reply, or None when Redis is unavailable, the claim expired or
+        the client sent no session id (anonymous clients must never share each other's replies).
+        """
+        if redis_client is None or not session_id or session_id == 'unknown':
+            return None
+        if files:
+            digest = await asyncio.to_thread(self.request_digest, session_id, message, files,
+                                             context, preferences)
+        else:
+            digest = self.request_digest(session_id, message, files, context, preferences)
+        inflight_key = "inflight:" + digest
+        token = uuid.uuid4().hex
+        try:
+            claimed = await redis_client.set(inflight_key, token, nx=True, ex=self.IDEMPOTENCY_TTL)
+            owner = token if claimed else await redis_client.get(inflight_key)
+        except Exception as e:
+            logger.warning(f"Redis idempotency check unavailable: {e}")
+            return None
+        if claimed:
+            return f"result:{token}", True
+        if owner is None:
+            return None
+        return f"result:{owner.decode('utf-8')}", False
+    
+    async def publish_result(self, result_key: str, result: Dict[str, Any]):
+        """Hand the first request's reply to any duplicates waiting on it"""
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.rpush(result_key, json.dumps(result))
+                pipe.expire(result_key, self.IDEMPOTENCY_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis idempotency result not stored: {e}")
+    
+    async def wait_for_result(self, result_key: str, session_id: str) -> Optional[Dict[str, Any]]:
+        """Block until the first request publishes its reply; None if it doesn't within IDEMPOTENCY_TTL"""
+        try:
+            popped = await redis_client.blpop([result_key], timeout=self.IDEMPOTENCY_TTL)
+            if popped is not None:
+                # Put the reply back for any other duplicate still waiting on it
+                await redis_client.rpush(result_key, popped[1])
+                logger.info(f"Duplicate chat request for session {session_id} served from the first reply")
+                return json.loads(popped[1])
+        except Exception as e:
+            logger.warning(f"Redis idempotency wait failed: {e}")
+        return None
+    
+    async def generate_chat_response(self, message: str, files: Optional[List[Dict]] = None,
+                                     context: Optional[Dict] = None, preferences: Optional[Dict] = None) -> Dict[str, Any]:
+        """Classify the message, call Gemini for it (or each file) and build the chat result
+        
+        Greetings are answered by process_chat_request_async before this is called.
+        """
         try:
             # Extract context information
             context = context or {}
             preferences = preferences or {}
             
             input_method = context.get('inputMethod', 'text')
-            session_id = context.get('sessionId', 'unknown')
+            session_id = self.session_id_of(context)
             previous_context = context.get('previousContext')
             
-            logger.info(f"Processing message via {input_method} for session {session_id}")
+            logger.debug("Processing message via %s for session %s", input_method, session_id)
             
             # Determine message type and create specialized prompt
             file_types = [f.get('mime_type', '') for f in (files or [])]
@@ -523,26 +1165,40 @@ class ChatbotBackend:
                 message, has_files, file_types
             )
             
-            # Create specialized prompt with enhanced context
-            specialized_prompt = self.prompt_engine.create_specialized_prompt(
-                message, message_type, context, preferences
-            )
-            
             # Process with Gemini API
             if has_files and files:
-                # Handle multimodal request
-                file_data = files[0]['data']  # Process first file
-                mime_type = files[0]['mime_type']
-                filename = files[0].get('filename', 'unknown')
+                # Handle multimodal request: one Gemini call per file, all in flight at once
+                # return_exceptions: one failing file still leaves the other files' analyses in the reply
+                responses = await asyncio.gather(*(
+                    self.process_file_async(message, file, context, preferences) for file in files
+                ), return_exceptions=True)
+                for index, file_response in enumerate(responses):
+                    if isinstance(file_response, Exception):
+                        logger.error(f"File processing error: {file_response}")
+                        responses[index] = ERROR_MESSAGES['file_unexpected'].format(details=str(file_response)[:200])
+                if len(files) == 1:
+                    response = responses[0]
+                else:
+                    response = "\n\n---\n\n".join(
+                        f"**{file.get('filename', 'unknown')}**\n\n{file_response}"
+                        for file, file_response in zip(files, responses)
+                    )
+            else:
+                context = await self.with_session_history(session_id, context)
+                previous_context = context.get('previousContext')
                 
-                logger.info(f"Processing file: {filename} ({mime_type})")
+                # Create specialized prompt with enhanced context
+                specialized_prompt = self.prompt_engine.create_specialized_prompt(
+                    message, message_type, context, preferences
+                )
                 
-                response = self.gemini_handler.process_multimodal_request(
-                    specialized_prompt, file_data, mime_type
+                # Handle text-only request; only standalone messages (no history or preferences) are
+                # eligible for near-duplicate matching, since those replies don't depend on the session
+                semantic_text = message if not previous_context and not preferences else None
+                response = await self.gemini_handler.process_text_request_async(
+                    specialized_prompt, message_type, semantic_text
                 )
-            else:
-                # Handle text-only request
-                response = self.gemini_handler.process_text_request(specialized_prompt)
+                await self.save_session_turn(session_id, message, response)
             
             return {
                 'success': True,
@@ -550,7 +1206,7 @@ class ChatbotBackend:
                 'message_type': message_type,
                 'input_method': input_method,
                 'session_id': session_id,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso(),
                 'has_files': has_files,
                 'context_used': bool(previous_context)
             }
@@ -561,52 +1217,194 @@ class ChatbotBackend:
                 'success': False,
                 'error': str(e),
                 'response': "⚠️ Sorry, I encountered an error processing your request. Please try again.",
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             }
 
+    process_chat_request = run_async(process_chat_request_async)
+    
+    async def load_session_history(self, session_id: str) -> Optional[Dict]:
+        """previousContext built from the session's stored turns; None without Redis or history"""
+        if redis_client is None or not session_id or session_id == 'unknown':
+            return None
+        try:
+            turns = await redis_client.lrange(f"ctx:{session_id}", -self.SESSION_HISTORY_TURNS, -1)
+        except Exception as e:
+            logger.warning(f"Redis session history unavailable: {e}")
+            return None
+        if not turns:
+            return None
+        turns = [json.loads(turn) for turn in turns]
+        return {
+            'messageCount': 2 * len(turns),
+            'recentMessages': "\n".join(f"user: {turn['user']}\nai: {turn['assistant']}" for turn in turns)
+        }
+    
+    async def with_session_history(self, session_id: str, context: Dict) -> Dict:
+        """context with previousContext filled from the stored session history when the client sent none"""
+        if context.get('previousContext'):
+            return context
+        previous_context = await self.load_session_history(session_id)
+        return {**context, 'previousContext': previous_context} if previous_context else context
+    
+    async def save_session_turn(self, session_id: str, message: str, response: str):
+        """Append a completed exchange to the session's history; failed replies are not remembered"""
+        if (redis_client is None or not session_id or session_id == 'unknown'
+                or response.startswith(ERROR_REPLY_HEADERS)):
+            return
+        history_key = f"ctx:{session_id}"
+        turn = json.dumps({'user': message[:200], 'assistant': response[:200]})
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.rpush(history_key, turn)
+                pipe.ltrim(history_key, -self.SESSION_HISTORY_TURNS, -1)
+                pipe.expire(history_key, self.SESSION_HISTORY_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis session history not saved: {e}")
+    
+    async def stream_chat_request_async(self, message: str, files: Optional[List[Dict]] = None,
+                                        context: Optional[Dict] = None, preferences: Optional[Dict] = None):
+        """Like process_chat_request_async, but yields the reply text in chunks as it is generated"""
+        context = context or {}
+        preferences = preferences or {}
+        
+        reply = self.greeting_reply(message, files)
+        if reply:
+            yield reply
+            return
+        
+        if files:
+            # File analysis isn't streamed; the whole reply is a single chunk
+            result = await self.process_chat_request_async(message, files, context, preferences)
+            yield result['response']
+            return
+        
+        session_id = self.session_id_of(context)
+        claim = await self.claim_request(session_id, message, files, context, preferences)
+        if claim is not None and not claim[1]:
+            result = await self.wait_for_result(claim[0], session_id)
+            if result is not None:
+                yield result['response']
+                return
+        
+        context = await self.with_session_history(session_id, context)
+        previous_context = context.get('previousContext')
+        message_type = self.prompt_engine.analyze_message_type(message)
+        specialized_prompt = self.prompt_engine.create_specialized_prompt(
+            message, message_type, context, preferences
+        )
+        semantic_text = message if not previous_context and not preferences else None
+        chunks = []
+        async for chunk in self.gemini_handler.stream_text_request_async(
+            specialized_prompt, message_type, semantic_text
+        ):
+            chunks.append(chunk)
+            yield chunk
+        
+        # Only a completed stream is remembered or handed to duplicates; a disconnect cancels before here
+        response = "".join(chunks)
+        await self.save_session_turn(session_id, message, response)
+        if claim is not None and claim[1]:
+            await self.publish_result(claim[0], {
+                'success': True,
+                'response': response,
+                'message_type': message_type,
+                'input_method': context.get('inputMethod', 'text'),
+                'session_id': session_id,
+                'timestamp': now_iso(),
+                'has_files': False,
+                'context_used': bool(previous_context)
+            })
+    
+    def greeting_reply(self, message: str, files: Optional[List[Dict]] = None) -> Optional[str]:
+        """Canned reply for a bare greeting or thanks; None for anything that needs the model"""
+        if files or len(message) >= 32:
+            return None
+        greeting = message.strip().lower()
+        if greeting not in GREETINGS:
+            return None
+        return random.choice(GREETING_REPLIES[greeting])
+    
+    async def process_file_async(self, message: str, file: Dict, context: Dict, preferences: Dict) -> str:
+        """Analyze one uploaded file with a prompt specialized for its type"""
+        mime_type = file['mime_type']
+        logger.debug("Processing file: %s (%s)", file.get('filename', 'unknown'), mime_type)
+        
+        message_type = self.prompt_engine.analyze_message_type(message, True, [mime_type])
+        specialized_prompt = self.prompt_engine.create_specialized_prompt(
+            message, message_type, context, preferences
+        )
+        return await self.gemini_handler.process_multimodal_request_async(
+            specialized_prompt, file['data'], mime_type
+        )
+
 # Initialize backend
 chatbot_backend = ChatbotBackend()
 
+@app.before_serving
+async def preload_models():
+    await chatbot_backend.gemini_handler.response_cache.preload()
+
+# Reject oversized requests from Content-Length (413) before the body is buffered; allows a few max-size files
+app.config['MAX_CONTENT_LENGTH'] = 5 * chatbot_backend.max_file_size
+
 # API Routes
+async def read_chat_request():
+    """Parse (message, context, preferences, files) from a JSON or multipart chat request"""
+    # Handle both JSON and form data
+    if request.is_json:
+        data = await request.get_json()
+        message = data.get('message', '')
+        context = data.get('context', {})
+        preferences = data.get('preferences', {})
+        files_data = data.get('files', [])
+    else:
+        form = await request.form
+        message = form.get('message', '')
+        context_str = form.get('context', '{}')
+        preferences_str = form.get('preferences', '{}')
+        
+        # Parse JSON strings
+        try:
+            context = app.json.loads(context_str)
+            preferences = app.json.loads(preferences_str)
+        except json.JSONDecodeError:
+            context = {}
+            preferences = {}
+        
+        files_data = []
+        
+        # Handle file uploads
+        request_files = await request.files
+        if 'files' in request_files:
+            uploaded_files = request_files.getlist('files')
+            for file in uploaded_files:
+                if file and file.filename and chatbot_backend.is_allowed_file(file.filename):
+                    # Quart has already buffered or spooled the part; check its size first so an
+                    # oversized file is never copied into a bytes object
+                    file.stream.seek(0, os.SEEK_END)
+                    file_size = file.stream.tell()
+                    file.stream.seek(0)
+                    if file_size <= chatbot_backend.max_file_size:
+                        file_data = file.read()
+                        mime_type = file.content_type or mimetypes.guess_type(file.filename)[0]
+                        files_data.append({
+                            'data': file_data,
+                            'mime_type': mime_type,
+                            'filename': secure_filename(file.filename)
+                        })
+    
+    return message, context, preferences, files_data
+
 @app.route('/api/chat', methods=['POST'])
-def chat_endpoint():
+async def chat_endpoint():
     """Main chat endpoint for processing user messages with enhanced context"""
+    if request.accept_mimetypes.best == 'text/event-stream':
+        # Clients that ask for SSE get the streamed reply from the same URL
+        return await chat_stream_endpoint()
+    
     try:
-        # Handle both JSON and form data
-        if request.is_json:
-            data = request.get_json()
-            message = data.get('message', '')
-            context = data.get('context', {})
-            preferences = data.get('preferences', {})
-            files_data = data.get('files', [])
-        else:
-            message = request.form.get('message', '')
-            context_str = request.form.get('context', '{}')
-            preferences_str = request.form.get('preferences', '{}')
-            
-            # Parse JSON strings
-            try:
-                context = json.loads(context_str)
-                preferences = json.loads(preferences_str)
-            except json.JSONDecodeError:
-                context = {}
-                preferences = {}
-            
-            files_data = []
-            
-            # Handle file uploads
-            if 'files' in request.files:
-                uploaded_files = request.files.getlist('files')
-                for file in uploaded_files:
-                    if file and file.filename and chatbot_backend.is_allowed_file(file.filename):
-                        file_data = file.read()
-                        if chatbot_backend.validate_file_size(file_data):
-                            mime_type = file.content_type or mimetypes.guess_type(file.filename)[0]
-                            files_data.append({
-                                'data': file_data,
-                                'mime_type': mime_type,
-                                'filename': secure_filename(file.filename)
-                            })
+        message, context, preferences, files_data = await read_chat_request()
         
         if not message.strip():
             return jsonify({
@@ -614,16 +1412,18 @@ def chat_endpoint():
                 'error': 'Message is required'
             }), 400
         
-        # Log incoming request for debugging
-        logger.info(f"Processing chat request: {message[:100]}...")
-        logger.info(f"Context: {context}")
-        logger.info(f"Files: {len(files_data)} files")
+        # Log incoming request for debugging; %-style arguments are only formatted when DEBUG is enabled
+        logger.debug("Processing chat request: %.100s...", message)
+        logger.debug("Context: %s", context)
+        logger.debug("Files: %d files", len(files_data))
         
         # Process the chat request with enhanced context
-        result = chatbot_backend.process_chat_request(message, files_data, context, preferences)
+        result = await chatbot_backend.process_chat_request_async(message, files_data, context, preferences)
         
         return jsonify(result)
         
+    except RequestEntityTooLarge:
+        raise  # Answered by the 413 handler below
     except Exception as e:
         logger.error(f"Chat endpoint error: {e}")
         return jsonify({
@@ -632,11 +1432,49 @@ def chat_endpoint():
             'response': "⚠️ Sorry, I encountered an error. Please try again."
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+async def chat_stream_endpoint():
+    """Streaming variant of /api/chat: the reply arrives as Server-Sent Events while Gemini generates it"""
+    try:
+        message, context, preferences, files_data = await read_chat_request()
+    except RequestEntityTooLarge:
+        raise  # Answered by the 413 handler below
+    except Exception as e:
+        logger.error(f"Chat stream endpoint error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error',
+            'response': "⚠️ Sorry, I encountered an error. Please try again."
+        }), 500
+    
+    if not message.strip():
+        return jsonify({
+            'success': False,
+            'error': 'Message is required'
+        }), 400
+    
+    logger.debug("Streaming chat request: %.100s...", message)
+    
+    async def generate():
+        # One `data:` event per text chunk, then `done`; a client disconnect cancels the Gemini stream
+        try:
+            async for chunk in chatbot_backend.stream_chat_request_async(message, files_data, context, preferences):
+                yield f"data: {app.json.dumps({'text': chunk})}\n\n"
+            yield f"event: done\ndata: {app.json.dumps({'success': True, 'timestamp': now_iso()})}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield f"event: error\ndata: {app.json.dumps({'success': False, 'response': '⚠️ Sorry, I encountered an error. Please try again.'})}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Keep nginx-style proxies from holding chunks back
+    return response
+
 @app.route('/api/config', methods=['POST'])
-def configure_api():
+async def configure_api():
     """Configure Gemini API key"""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         api_key = data.get('api_key', '')
         
         if not api_key:
@@ -645,8 +1483,8 @@ def configure_api():
                 'error': 'API key is required'
             }), 400
         
-        # Update Gemini handler with new API key
-        chatbot_backend.gemini_handler = GeminiAPIHandler(api_key)
+        # Rotate the key in place: cached replies stay valid for the same model
+        chatbot_backend.gemini_handler.configure(api_key)
         
         return jsonify({
             'success': True,
@@ -662,45 +1500,49 @@ def configure_api():
         }), 500
 
 @app.route('/api/status', methods=['GET'])
-def get_status():
+async def get_status():
     """Get backend status and availability"""
     return jsonify({
         'backend_available': True,
         'gemini_available': chatbot_backend.gemini_handler.is_available(),
         'supported_files': list(chatbot_backend.allowed_extensions),
         'max_file_size_mb': chatbot_backend.max_file_size // (1024 * 1024),
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now_iso()
     })
 
 @app.route('/api/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now_iso()
     })
 
 # Error handlers
 @app.errorhandler(413)
-def too_large(e):
+async def too_large(e):
     return jsonify({
         'success': False,
-        'error': 'File too large. Maximum size is 10MB.'
+        'error': 'Upload too large. Maximum size is 10MB per file.'
     }), 413
 
 @app.errorhandler(415)
-def unsupported_media_type(e):
+async def unsupported_media_type(e):
     return jsonify({
         'success': False,
         'error': 'Unsupported file type.'
     }), 415
 
 if __name__ == '__main__':
-    # Configure for development
+    # Configure for development; in production serve with `hypercorn -k uvloop -b 0.0.0.0:5000 chatbot_backend:app`
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
     logger.info(f"Starting Disaster Management Chatbot Backend on port {port}")
     logger.info(f"Gemini API available: {chatbot_backend.gemini_handler.is_available()}")
     
+    if uvloop is not None:
+        # app.run() builds its loop with asyncio.new_event_loop(), so the dev server runs on uvloop too
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file